@@ -0,0 +1,36 @@
+"""add service_revisions change counter
+
+Revision ID: 5b1f0c2e7a91
+Revises: ad627b184aa2
+Create Date: 2026-10-19 15:02:11.418230
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "5b1f0c2e7a91"
+down_revision: Union[str, None] = "ad627b184aa2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "service_revisions",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("revision", sa.Integer(), nullable=False),
+        sa.Column("changed_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.execute(
+        "INSERT INTO service_revisions (id, revision, changed_at) "
+        "VALUES (1, 0, CURRENT_TIMESTAMP)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("service_revisions")
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+analytics_cache.py
+------------------
+Share analytics results between uvicorn workers through memory-mapped files.
+
+- One process computes (whichever worker wins a file lock, or a sidecar)
+- Results are published as versioned snapshot files, swapped in atomically
+- Every worker mmaps the snapshot and serves the stored JSON bytes as-is:
+  no re-parse, no re-serialize; a request costs one memcpy out of the
+  page cache
+
+Snapshot layout (little-endian):
+    magic "DLAC" | u32 format | u64 version | u64 published_at_ns
+    | u32 source_len | u32 payload_len | source JSON | payload JSON
+
+Usage (sidecar):
+    python -m app.analytics_cache /var/log/nginx/access.log --interval 10
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from app.log_analyzer import analyze_logs
+
+try:  # POSIX only — without it every worker computes for itself
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+MAGIC = b"DLAC"
+FORMAT = 1
+HEADER = struct.Struct("<4sIQQII")
+
+MODES = ("off", "leader", "sidecar")
+
+
+def _default_directory() -> Path:
+    shm = Path("/dev/shm")
+    base = (
+        shm if shm.is_dir() and os.access(shm, os.W_OK) else Path(tempfile.gettempdir())
+    )
+    return base / "devops-lab-analytics"
+
+
+def _source_stamp(log_path: Path) -> dict | None:
+    """Identify the log contents a snapshot was computed from."""
+    try:
+        st = log_path.stat()
+    except OSError:
+        return None
+    return {"path": str(log_path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    version: int
+    published_at: float
+    source: dict
+    payload: bytes
+
+
+class SharedAnalytics:
+    """Publish/read analytics snapshots shared by all workers on this host."""
+
+    def __init__(
+        self,
+        directory: str | Path | None = None,
+        mode: str = "leader",
+        max_staleness: float = 5.0,
+        compute: Callable[[str | Path], dict] = analyze_logs,
+    ) -> None:
+        self.directory = Path(directory) if directory else _default_directory()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.mode = mode
+        self.max_staleness = max_staleness
+        self.compute = compute
+        # data path -> ((st_ino, st_mtime_ns), mmap) for the mapping we hold
+        self._maps: dict[Path, tuple[tuple[int, int], mmap.mmap]] = {}
+        self._maps_lock = threading.Lock()  # requests read from a thread pool
+
+    # ------------------------------------------------------------------ paths
+    def _paths(self, log_path: Path) -> tuple[Path, Path]:
+        key = hashlib.blake2b(str(log_path).encode(), digest_size=8).hexdigest()
+        return self.directory / f"{key}.snap", self.directory / f"{key}.lock"
+
+    # ------------------------------------------------------------------ read
+    def _mapping(self, data_path: Path) -> mmap.mmap | None:
+        try:
+            st = data_path.stat()
+        except OSError:
+            return None
+        identity = (st.st_ino, st.st_mtime_ns)
+        cached = self._maps.get(data_path)
+        if cached and cached[0] == identity:
+            return cached[1]
+        if cached:
+            cached[1].close()
+            del self._maps[data_path]
+        if st.st_size < HEADER.size:
+            return None
+        with data_path.open("rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps[data_path] = (identity, mapped)
+        return mapped
+
+    def read(self, log_path: str | Path) -> Snapshot | None:
+        """Return the latest published snapshot for `log_path`, if any."""
+        log_path = Path(log_path).resolve()
+        with self._maps_lock:
+            mapped = self._mapping(self._paths(log_path)[0])
+            if mapped is None:
+                return None
+            magic, fmt, version, published_ns, source_len, payload_len = (
+                HEADER.unpack_from(mapped)
+            )
+            if magic != MAGIC or fmt != FORMAT:
+                return None
+            # Copied out under the lock: the mapping may be swapped (and
+            # closed) by another thread as soon as we release it.
+            start = HEADER.size
+            source = mapped[start : start + source_len]
+            start += source_len
+            payload = mapped[start : start + payload_len]
+        return Snapshot(
+            version=version,
+            published_at=published_ns / 1e9,
+            source=json.loads(source),
+            payload=payload,
+        )
+
+    def is_fresh(self, snapshot: Snapshot, log_path: str | Path) -> bool:
+        """Fresh if the log is unchanged, or the snapshot is recent enough."""
+        if time.time() - snapshot.published_at <= self.max_staleness:
+            return True
+        return snapshot.source == _source_stamp(Path(log_path).resolve())
+
+    # ------------------------------------------------------------------ write
+    def publish(
+        self, log_path: str | Path, result: dict, source: dict | None = None
+    ) -> int:
+        """Write a new snapshot version atomically; returns the version number."""
+        log_path = Path(log_path).resolve()
+        data_path, _ = self._paths(log_path)
+        previous = self.read(log_path)
+        version = previous.version + 1 if previous else 1
+
+        source_bytes = json.dumps(source or _source_stamp(log_path) or {}).encode()
+        payload = json.dumps(result).encode()
+        header = HEADER.pack(
+            MAGIC, FORMAT, version, time.time_ns(), len(source_bytes), len(payload)
+        )
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(header + source_bytes + payload)
+            # Readers keep their old mapping until they notice the new inode.
+            os.replace(tmp_name, data_path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        return version
+
+    def refresh(self, log_path: str | Path) -> Snapshot | dict | None:
+        """
+        Recompute and publish (caller should hold the lock). Returns the
+        compute result as-is when it reports an error (nothing is published).
+        """
+        log_path = Path(log_path).resolve()
+        source = _source_stamp(log_path)
+        result = self.compute(log_path)
+        if "error" in result:
+            return result
+        self.publish(log_path, result, source)
+        return self.read(log_path)
+
+    # ------------------------------------------------------------------ serve
+    def _compute_local(self, log_path: Path) -> bytes | dict:
+        result = self.compute(log_path)
+        return result if "error" in result else json.dumps(result).encode()
+
+    def get_or_compute(self, log_path: str | Path) -> bytes | dict:
+        """
+        Serve the shared snapshot when fresh. Otherwise, in leader mode, one
+        worker (whoever takes the lock) recomputes while the others keep
+        serving the stale snapshot; they only wait for it when nothing has
+        been published yet. In sidecar mode workers never publish: they serve
+        whatever the sidecar wrote last, computing locally only if nothing
+        has been published yet.
+
+        Returns the JSON payload bytes, or the compute error dict.
+        """
+        log_path = Path(log_path).resolve()
+        snapshot = self.read(log_path)
+        if snapshot and self.is_fresh(snapshot, log_path):
+            return snapshot.payload
+
+        if self.mode != "leader" or fcntl is None:
+            if snapshot:
+                return snapshot.payload
+            return self._compute_local(log_path)
+
+        _, lock_path = self._paths(log_path)
+        with lock_path.open("a") as lock:
+            if snapshot is None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            else:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    return snapshot.payload  # another worker is refreshing
+            try:
+                # Another worker may have refreshed while we waited.
+                snapshot = self.read(log_path)
+                if not (snapshot and self.is_fresh(snapshot, log_path)):
+                    snapshot = self.refresh(log_path)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+        if isinstance(snapshot, dict):
+            return snapshot  # compute error: don't retry, let the caller 404
+        if snapshot is None:
+            return self._compute_local(log_path)
+        return snapshot.payload
+
+    def close(self) -> None:
+        with self._maps_lock:
+            for _, mapped in self._maps.values():
+                mapped.close()
+            self._maps.clear()
+
+
+def from_env() -> SharedAnalytics | None:
+    """Build the shared cache from ANALYTICS_SHARED / _DIR / _MAX_STALENESS."""
+    mode = os.getenv("ANALYTICS_SHARED", "off").strip().lower()
+    if mode not in MODES:
+        raise ValueError(f"ANALYTICS_SHARED must be one of {MODES}, got {mode!r}")
+    if mode == "off":
+        return None
+    return SharedAnalytics(
+        directory=os.getenv("ANALYTICS_SHARED_DIR") or None,
+        mode=mode,
+        max_staleness=float(os.getenv("ANALYTICS_MAX_STALENESS", "5")),
+    )
+
+
+def main():
+    """Sidecar entrypoint — recompute and publish whenever the log changes."""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Publish access log analytics to shared memory for API workers."
+    )
+    parser.add_argument("logfile", help="Path to the access log to analyze.")
+    parser.add_argument(
+        "--interval", type=float, default=10.0, help="Seconds between checks."
+    )
+    parser.add_argument("--dir", help="Snapshot directory (default: /dev/shm/...).")
+    parser.add_argument("--once", action="store_true", help="Publish once and exit.")
+    args = parser.parse_args()
+
+    cache = SharedAnalytics(directory=args.dir, mode="sidecar")
+    log_path = Path(args.logfile).resolve()
+    last_source = None
+    while True:
+        source = _source_stamp(log_path)
+        if source is not None and source != last_source:
+            snapshot = cache.refresh(log_path)
+            if isinstance(snapshot, dict):
+                print(f"skipped: {snapshot['error']}")
+            elif snapshot:
+                last_source = source
+                print(f"published v{snapshot.version} ({len(snapshot.payload)} bytes)")
+        if args.once:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
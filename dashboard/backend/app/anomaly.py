@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+anomaly.py
+----------
+Streaming error-rate anomaly detection for access logs.
+
+- Fixed time windows (by log timestamp), evaluated as each window closes
+- Per-key EWMA baseline of error rate and its variance: O(1) state per key
+- One global key plus per-endpoint keys, capped with LRU eviction
+- Flags windows whose error rate exceeds the baseline by k sigma
+  (and by an absolute margin, so near-zero baselines don't over-fire)
+- Tracks an EWMA of requests per window for the global key and flags
+  traffic surges and collapses (including windows with no traffic)
+"""
+
+from __future__ import annotations
+
+import calendar
+import math
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+
+_MONTHS = {
+    m: i
+    for i, m in enumerate(
+        "Jan Feb Mar Apr May Jun Jul Aug Sep Oct Nov Dec".split(), start=1
+    )
+}
+
+GLOBAL_KEY = "*"
+MAX_GAP_WINDOWS = 60  # empty windows replayed into the traffic baseline per gap
+
+
+def log_time_to_epoch(value: str) -> int | None:
+    """Parse '07/Nov/2025:12:00:00 +0000' to epoch seconds (fast path, no strptime)."""
+    try:
+        day, month, year = int(value[0:2]), _MONTHS[value[3:6]], int(value[7:11])
+        hour, minute, second = int(value[12:14]), int(value[15:17]), int(value[18:20])
+        epoch = calendar.timegm((year, month, day, hour, minute, second))
+        tz = value[21:26]
+        if tz:
+            offset = int(tz[1:3]) * 3600 + int(tz[3:5]) * 60
+            epoch -= offset if tz[0] == "+" else -offset
+        return epoch
+    except (KeyError, ValueError, IndexError):
+        return None
+
+
+class _KeyState:
+    """Counts for the open window plus the EWMA baseline for one key."""
+
+    __slots__ = (
+        "window",
+        "requests",
+        "errors",
+        "mean",
+        "var",
+        "windows_seen",
+        "traffic_window",
+        "traffic_mean",
+        "traffic_var",
+        "traffic_seen",
+    )
+
+    def __init__(self, window: int) -> None:
+        self.window = window
+        self.requests = 0
+        self.errors = 0
+        self.mean = 0.0  # EWMA of per-window error rate
+        self.var = 0.0  # EWMA of squared deviation
+        self.windows_seen = 0
+        # Global key only: last window folded into the requests-per-window EWMA.
+        self.traffic_window = window - 1
+        self.traffic_mean = 0.0
+        self.traffic_var = 0.0
+        self.traffic_seen = 0
+
+
+class ErrorRateDetector:
+    """
+    Online detector fed one parsed log line at a time via observe().
+
+    Errors are 5xx responses by default. A window is anomalous when
+    requests >= min_requests, the key has seen `warmup` windows, and
+        rate > mean + max(threshold * std, min_delta)
+
+    Traffic (global key): once `warmup` windows are in and the baseline
+    averages at least min_requests, a complete window is a surge/collapse when
+        |requests - mean| > max(threshold * std, min_traffic_ratio * mean)
+    with std floored at sqrt(mean) (Poisson noise).
+    """
+
+    def __init__(
+        self,
+        window_seconds: int = 60,
+        alpha: float = 0.1,
+        threshold: float = 3.0,
+        min_delta: float = 0.05,
+        min_requests: int = 20,
+        warmup: int = 5,
+        max_keys: int = 200,
+        max_anomalies: int = 100,
+        error_prefixes: tuple[str, ...] = ("5",),
+        min_traffic_ratio: float = 0.5,
+    ) -> None:
+        self.window_seconds = window_seconds
+        self.alpha = alpha
+        self.threshold = threshold
+        self.min_delta = min_delta
+        self.min_requests = min_requests
+        self.warmup = warmup
+        self.max_keys = max_keys
+        self.error_prefixes = error_prefixes
+        self.min_traffic_ratio = min_traffic_ratio
+        self.global_state: _KeyState | None = None
+        self.endpoints: OrderedDict[str, _KeyState] = OrderedDict()
+        self.anomalies: deque[dict] = deque(maxlen=max_anomalies)
+        self.evicted_keys = 0
+
+    # ------------------------------------------------------------------ feed
+    def observe(self, epoch: int | None, endpoint: str, status: str) -> list[dict]:
+        """Account one request; returns anomalies raised by windows it closed."""
+        if epoch is None:
+            return []
+        window = epoch // self.window_seconds
+        is_error = status.startswith(self.error_prefixes)
+        raised = []
+
+        if self.global_state is None:
+            self.global_state = _KeyState(window)
+        self._account(GLOBAL_KEY, self.global_state, window, is_error, raised)
+
+        endpoint = endpoint.split("?", 1)[0]  # bound key space: ignore query strings
+        state = self.endpoints.get(endpoint)
+        if state is None:
+            if len(self.endpoints) >= self.max_keys:
+                self.endpoints.popitem(last=False)
+                self.evicted_keys += 1
+            state = self.endpoints[endpoint] = _KeyState(window)
+        else:
+            self.endpoints.move_to_end(endpoint)
+        self._account(endpoint, state, window, is_error, raised)
+        return raised
+
+    def advance(self, epoch: int) -> list[dict]:
+        """
+        Close windows that ended over a window ago (for quiet live logs).
+        The grace window leaves room for lines nginx writes late.
+        """
+        window = epoch // self.window_seconds
+        raised = []
+        keys = [(GLOBAL_KEY, self.global_state)] if self.global_state else []
+        for key, state in keys + list(self.endpoints.items()):
+            if state.window < window - 1:
+                self._close(key, state, raised)
+        if self.global_state is not None:
+            # Windows that saw no requests at all (the log went quiet).
+            self._close_empty(self.global_state, window - 1, raised)
+        return raised
+
+    def finish(self) -> list[dict]:
+        """Evaluate the still-open windows at end of input."""
+        raised = []
+        keys = [(GLOBAL_KEY, self.global_state)] if self.global_state else []
+        for key, state in keys + list(self.endpoints.items()):
+            # The last window is usually cut short: judge its errors, not its volume.
+            self._close(key, state, raised, traffic=False)
+        return raised
+
+    # ------------------------------------------------------------------ state
+    def _account(
+        self, key: str, state: _KeyState, window: int, is_error: bool, raised: list
+    ) -> None:
+        # Late (out-of-order) lines are counted in the open window.
+        if window > state.window:
+            self._close(key, state, raised)
+            if state is self.global_state:
+                self._close_empty(state, window, raised)
+            state.window = window
+        state.requests += 1
+        state.errors += is_error
+
+    def _close(
+        self, key: str, state: _KeyState, raised: list, traffic: bool = True
+    ) -> None:
+        if state.requests == 0:
+            return
+        if traffic and state is self.global_state:
+            self._observe_traffic(state, state.window, state.requests, raised)
+        rate = state.errors / state.requests
+        if state.requests >= self.min_requests and state.windows_seen >= self.warmup:
+            std = math.sqrt(state.var)
+            limit = state.mean + max(self.threshold * std, self.min_delta)
+            if rate > limit:
+                anomaly = {
+                    "key": key,
+                    "kind": "error_rate",
+                    "window_start": datetime.fromtimestamp(
+                        state.window * self.window_seconds, timezone.utc
+                    ).isoformat(),
+                    "window_seconds": self.window_seconds,
+                    "requests": state.requests,
+                    "errors": state.errors,
+                    "error_rate": round(rate, 4),
+                    "baseline_rate": round(state.mean, 4),
+                    "baseline_std": round(std, 4),
+                }
+                self.anomalies.append(anomaly)
+                raised.append(anomaly)
+
+        if state.requests >= self.min_requests:
+            # Thin windows are too noisy to move the baseline.
+            if state.windows_seen == 0:
+                state.mean = rate
+            else:
+                diff = rate - state.mean
+                state.mean += self.alpha * diff
+                state.var = (1 - self.alpha) * (state.var + self.alpha * diff * diff)
+            state.windows_seen += 1
+        state.requests = 0
+        state.errors = 0
+
+    def _close_empty(self, state: _KeyState, before: int, raised: list) -> None:
+        """Fold the windows after the last one seen, up to `before`, in as zero."""
+        start = max(state.traffic_window + 1, before - MAX_GAP_WINDOWS)
+        for window in range(start, before):
+            self._observe_traffic(state, window, 0, raised)
+
+    def _observe_traffic(
+        self, state: _KeyState, window: int, requests: int, raised: list
+    ) -> None:
+        if window <= state.traffic_window:
+            return
+        state.traffic_window = window
+        mean = state.traffic_mean
+        if state.traffic_seen >= self.warmup and mean >= self.min_requests:
+            std = math.sqrt(max(state.traffic_var, mean))
+            margin = max(self.threshold * std, self.min_traffic_ratio * mean)
+            if abs(requests - mean) > margin:
+                anomaly = {
+                    "key": GLOBAL_KEY,
+                    "kind": "traffic_surge" if requests > mean else "traffic_collapse",
+                    "window_start": datetime.fromtimestamp(
+                        window * self.window_seconds, timezone.utc
+                    ).isoformat(),
+                    "window_seconds": self.window_seconds,
+                    "requests": requests,
+                    "baseline_requests": round(mean, 1),
+                    "baseline_std": round(std, 1),
+                }
+                self.anomalies.append(anomaly)
+                raised.append(anomaly)
+
+        if state.traffic_seen == 0:
+            state.traffic_mean = float(requests)
+        else:
+            diff = requests - mean
+            state.traffic_mean += self.alpha * diff
+            state.traffic_var = (1 - self.alpha) * (
+                state.traffic_var + self.alpha * diff * diff
+            )
+        state.traffic_seen += 1
+
+    def summary(self) -> dict:
+        """Compact view for the analytics response."""
+        return {
+            "window_seconds": self.window_seconds,
+            "threshold_sigma": self.threshold,
+            "tracked_endpoints": len(self.endpoints),
+            "evicted_endpoints": self.evicted_keys,
+            "baseline_error_rate": (
+                round(self.global_state.mean, 4) if self.global_state else None
+            ),
+            "baseline_requests_per_window": (
+                round(self.global_state.traffic_mean, 1) if self.global_state else None
+            ),
+            "detected": list(self.anomalies),
+        }
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+compression.py
+--------------
+Response compression middleware (brotli preferred, gzip fallback).
+
+- Negotiates on the client's Accept-Encoding header
+- Uses brotli when the client accepts it, gzip otherwise
+- Streaming bodies are flushed chunk by chunk, never held back
+- Leaves small bodies, already-encoded responses and Server-Sent Events
+  (text/event-stream) untouched
+"""
+
+from __future__ import annotations
+
+import zlib
+
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+def _accepts(accept_encoding: str, coding: str) -> bool:
+    """Return True if `coding` is listed (and not refused with q=0)."""
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        if name.strip() != coding:
+            continue
+        params = params.replace(" ", "")
+        if not params.startswith("q="):
+            return True
+        try:
+            return float(params[2:]) > 0
+        except ValueError:
+            return False
+    return False
+
+
+class CompressionMiddleware:
+    """Compress HTTP responses with brotli or gzip, whichever the client accepts."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 500,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            accept_encoding = Headers(scope=scope).get("Accept-Encoding", "")
+            if _accepts(accept_encoding, "br"):
+                compressor = brotli.Compressor(quality=self.brotli_quality)
+                responder = EncodingResponder(
+                    self.app, self.minimum_size, "br", compressor
+                )
+                await responder(scope, receive, send)
+                return
+            if _accepts(accept_encoding, "gzip"):
+                compressor = GzipCompressor(self.gzip_level)
+                responder = EncodingResponder(
+                    self.app, self.minimum_size, "gzip", compressor
+                )
+                await responder(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+class GzipCompressor:
+    """zlib gzip stream with brotli.Compressor's process/flush/finish API."""
+
+    def __init__(self, level: int = 6) -> None:
+        self._zlib = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31: gzip header
+
+    def process(self, data: bytes) -> bytes:
+        return self._zlib.compress(data)
+
+    def flush(self) -> bytes:
+        return self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._zlib.flush(zlib.Z_FINISH)
+
+
+class EncodingResponder:
+    """
+    Compress one response with `compressor` (brotli or gzip).
+
+    Unlike Starlette's GZipResponder, every streamed chunk is flushed so
+    the client receives it immediately.
+    """
+
+    def __init__(
+        self, app: ASGIApp, minimum_size: int, coding: str, compressor
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.coding = coding
+        self.compressor = compressor
+        self.send: Send | None = None
+        self.initial_message: Message = {}
+        self.started = False
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Hold the start message until we know whether the body is compressed.
+            self.initial_message = message
+            headers = Headers(raw=message["headers"])
+            # SSE: proxies/browsers expect each event as soon as it's written.
+            self.passthrough = "content-encoding" in headers or headers.get(
+                "content-type", ""
+            ).startswith("text/event-stream")
+            return
+
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.passthrough:
+            if not self.started:
+                self.started = True
+                await self.send(self.initial_message)
+            await self.send(message)
+            return
+
+        if not self.started:
+            self.started = True
+            if len(body) < self.minimum_size and not more_body:
+                # Don't compress small outgoing responses.
+                self.passthrough = True
+                await self.send(self.initial_message)
+                await self.send(message)
+                return
+
+            headers = MutableHeaders(raw=self.initial_message["headers"])
+            headers["Content-Encoding"] = self.coding
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                del headers["Content-Length"]
+                message["body"] = (
+                    self.compressor.process(body) + self.compressor.flush()
+                )
+            else:
+                message["body"] = (
+                    self.compressor.process(body) + self.compressor.finish()
+                )
+                headers["Content-Length"] = str(len(message["body"]))
+            await self.send(self.initial_message)
+            await self.send(message)
+            return
+
+        # Remaining chunks of a streaming response.
+        chunk = self.compressor.process(body)
+        chunk += self.compressor.flush() if more_body else self.compressor.finish()
+        message["body"] = chunk
+        await self.send(message)
@@ -6,12 +6,16 @@ SQLAlchemy engine/session setup with .env support.
 - Works with Neon (adds sslmode if missing)
 - Uses psycopg3 by default (postgresql+psycopg)
 - Falls back to SQLite for local dev when DATABASE_URL is absent
+- Lazy: importing this module reads no env and opens no engine; the engine
+  is created on first use (or by the app lifespan) and can be pre-warmed
 """
 
 from __future__ import annotations
 
 import os
 import warnings
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
 
@@ -19,17 +23,19 @@ from dotenv import load_dotenv
 from sqlalchemy import create_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
-# ----------------------------- ENV LOADING -----------------------------
+from app.instrumentation import track_engine
+
 BASE_DIR = Path(__file__).resolve().parent.parent  # .../backend
-load_dotenv(BASE_DIR / ".env")
 
-raw_url = os.getenv("DATABASE_URL", "").strip().strip("'").strip('"')
+Base = declarative_base()
 
 
+# ----------------------------- ENV LOADING -----------------------------
 def _normalize_db_url(url: str) -> tuple[str, dict]:
     """
     Normalize DATABASE_URL for SQLAlchemy:
     - If empty -> SQLite fallback
+    - If 'sqlite:' -> allow use across threads
     - If 'postgresql://' -> upgrade to 'postgresql+psycopg://'
     - Ensure sslmode=require for Neon if missing
     Returns: (normalized_url, connect_args)
@@ -42,6 +48,10 @@ def _normalize_db_url(url: str) -> tuple[str, dict]:
         sqlite_path = BASE_DIR / "dev.db"
         return f"sqlite:///{sqlite_path}", {"check_same_thread": False}
 
+    if url.startswith("sqlite"):
+        # Sessions are used from FastAPI's threadpool.
+        return url, {"check_same_thread": False}
+
     # Force psycopg3 driver if user provided plain postgresql://
     if url.startswith("postgresql://") and "+psycopg" not in url:
         url = url.replace("postgresql://", "postgresql+psycopg://", 1)
@@ -59,26 +69,93 @@ def _normalize_db_url(url: str) -> tuple[str, dict]:
     return url, {}  # no special connect_args for Postgres
 
 
-DATABASE_URL, CONNECT_ARGS = _normalize_db_url(raw_url)
+@lru_cache(maxsize=1)
+def load_env() -> None:
+    """Load backend/.env into os.environ (once; real env vars win)."""
+    load_dotenv(BASE_DIR / ".env")
 
-# ----------------------------- ENGINE / SESSION -----------------------------
-engine = create_engine(
-    DATABASE_URL,
-    echo=True,  # set False in production
-    future=True,
-    pool_pre_ping=True,
-    connect_args=CONNECT_ARGS,
-)
 
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+@lru_cache(maxsize=1)
+def get_database_settings() -> tuple[str, dict]:
+    """Load .env once and return the normalized (url, connect_args)."""
+    load_env()
+    raw_url = os.getenv("DATABASE_URL", "").strip().strip("'").strip('"')
+    return _normalize_db_url(raw_url)
 
-Base = declarative_base()
+
+# ----------------------------- ENGINE / SESSION -----------------------------
+@lru_cache(maxsize=1)
+def get_engine():
+    """Create the shared engine on first use."""
+    url, connect_args = get_database_settings()
+    engine = create_engine(
+        url,
+        # SQL logging goes to stdout on every statement; opt in with DB_ECHO=1.
+        echo=os.getenv("DB_ECHO", "").lower() in ("1", "true", "yes"),
+        future=True,
+        pool_pre_ping=True,
+        connect_args=connect_args,
+    )
+    track_engine(engine)  # per-request query counts (see app.instrumentation)
+    return engine
+
+
+@lru_cache(maxsize=1)
+def get_sessionmaker() -> sessionmaker:
+    """Session factory bound to the lazily created engine."""
+    return sessionmaker(
+        bind=get_engine(), autoflush=False, autocommit=False, future=True
+    )
+
+
+def warm_pool(connections: int = 2) -> int:
+    """
+    Open (and return to the pool) up to `connections` connections so the
+    first requests skip DNS/TLS/auth. Returns how many were established.
+    Meant to run in a background thread during startup.
+    """
+    engine = get_engine()
+    connections = max(1, connections)
+
+    def _checkout(_: int) -> bool:
+        try:
+            with engine.connect() as conn:
+                conn.exec_driver_sql("SELECT 1")
+            return True
+        except Exception as e:  # warming is best-effort
+            warnings.warn(f"Connection pool pre-warm failed: {e}", RuntimeWarning)
+            return False
+
+    # Hold all connections concurrently so the pool really grows to N.
+    with ThreadPoolExecutor(max_workers=connections) as executor:
+        return sum(executor.map(_checkout, range(connections)))
+
+
+def dispose_engine() -> None:
+    """Close pooled connections and forget the engine (app shutdown / tests)."""
+    if get_engine.cache_info().currsize:
+        get_engine().dispose()
+    get_sessionmaker.cache_clear()
+    get_engine.cache_clear()
+
+
+def __getattr__(name: str):
+    # Backwards-compatible lazy module attributes (alembic env.py, tests).
+    if name == "engine":
+        return get_engine()
+    if name == "SessionLocal":
+        return get_sessionmaker()
+    if name == "DATABASE_URL":
+        return get_database_settings()[0]
+    if name == "CONNECT_ARGS":
+        return get_database_settings()[1]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # ----------------------------- FASTAPI HELPERS -----------------------------
 def get_db():
     """FastAPI dependency to provide a DB session."""
-    db = SessionLocal()
+    db = get_sessionmaker()()
     try:
         yield db
     finally:
@@ -91,15 +168,19 @@ def init_db():
     Use only for local dev or tests; production should use Alembic migrations.
     """
     import app.models  # noqa: F401 - ensure models are imported
+    from app.models.service_revision import seed_services_revision
 
-    Base.metadata.create_all(bind=engine)
+    Base.metadata.create_all(bind=get_engine())
+    with get_sessionmaker()() as db:
+        seed_services_revision(db)  # the Alembic migration seeds it too
+        db.commit()
 
 
 # ----------------------------- SELF-TEST -----------------------------
 if __name__ == "__main__":
-    print("Testing DB connection to:", DATABASE_URL)
+    print("Testing DB connection to:", get_database_settings()[0])
     try:
-        with engine.connect() as conn:
+        with get_engine().connect() as conn:
             # simple no-op to confirm connection
             conn.exec_driver_sql("SELECT 1")
         print("✅ Connected successfully!")
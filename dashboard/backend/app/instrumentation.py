@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+instrumentation.py
+------------------
+Per-request DB query counting.
+
+- A SQLAlchemy cursor hook bumps a per-request counter (contextvar)
+- QueryCountMiddleware scopes the counter to each HTTP request and reports
+  it in an `X-DB-Queries` response header (enabled with DB_QUERY_COUNT_HEADER=1)
+"""
+
+from __future__ import annotations
+
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+QUERY_COUNT_HEADER = "X-DB-Queries"
+
+# One-element list so threadpool copies of the context share the same counter.
+_query_count: ContextVar[list[int] | None] = ContextVar("query_count", default=None)
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany) -> None:
+    counter = _query_count.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+def track_engine(engine) -> None:
+    """Count every statement executed through `engine`."""
+    event.listen(engine, "before_cursor_execute", _count_query)
+
+
+class QueryCountMiddleware:
+    """Add the number of DB statements a request executed as a response header."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        counter = [0]
+        token = _query_count.set(counter)
+
+        async def send_with_count(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers[QUERY_COUNT_HEADER] = str(counter[0])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_count)
+        finally:
+            _query_count.reset(token)
@@ -0,0 +1,481 @@
+#!/usr/bin/env python3
+"""
+loadtest.py
+-----------
+Async HTTP load generator for the services CRUD API.
+
+- Targets the app in-process (ASGI transport, no sockets, on a fresh
+  throwaway SQLite DB each run) or a running server via --url, which
+  must use a disposable database: the run inserts rows and never
+  deletes them
+- Weighted read/write mix over get_services / get_service /
+  create_service / update_service
+- Closed loop (--concurrency N) or open loop (--rps R, latency measured
+  from the scheduled send time so queueing shows up in the tail)
+- Reports throughput, p50/p95/p99/max latency and DB queries per request
+  (from the X-DB-Queries header), and writes JSON for run-to-run diffs
+
+Usage:
+    python -m app.loadtest --duration 20 --concurrency 16 --json run.json
+    python -m app.loadtest --rps 200 --mix get_services=8,update_service=2
+    python -m app.loadtest --compare before.json after.json
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.instrumentation import QUERY_COUNT_HEADER
+
+DEFAULT_MIX = {
+    "get_services": 60,
+    "get_service": 20,
+    "create_service": 10,
+    "update_service": 10,
+}
+STATUSES = ("Running", "Stopped", "Degraded")
+
+
+# =========================================================
+#                  OPERATIONS
+# =========================================================
+
+
+class Workload:
+    """Issues the API calls; remembers created ids for reads/updates."""
+
+    def __init__(self, client: httpx.AsyncClient, rng: random.Random) -> None:
+        self.client = client
+        self.rng = rng
+        self.ids: list[int] = []
+        self.created = 0
+
+    async def seed(self, rows: int) -> None:
+        for _ in range(rows):
+            await self.create_service()
+        if not self.ids:
+            raise RuntimeError("Could not create seed services; is the DB reachable?")
+
+    async def get_services(self) -> httpx.Response:
+        return await self.client.get("/api/v1/services")
+
+    async def get_service(self) -> httpx.Response:
+        return await self.client.get(f"/api/v1/services/{self.rng.choice(self.ids)}")
+
+    async def create_service(self) -> httpx.Response:
+        self.created += 1
+        response = await self.client.post(
+            "/api/v1/services",
+            json={"name": f"load-{self.created}", "status": self.rng.choice(STATUSES)},
+        )
+        if response.status_code == 201:
+            self.ids.append(response.json()["id"])
+        return response
+
+    async def update_service(self) -> httpx.Response:
+        service_id = self.rng.choice(self.ids)
+        return await self.client.put(
+            f"/api/v1/services/{service_id}",
+            json={"name": f"load-{service_id}", "status": self.rng.choice(STATUSES)},
+        )
+
+
+# =========================================================
+#                  STATS
+# =========================================================
+
+
+@dataclass
+class OperationStats:
+    latencies: list[float] = field(default_factory=list)
+    statuses: dict[int, int] = field(default_factory=dict)
+    errors: int = 0
+    db_queries: int = 0
+    db_samples: int = 0
+
+    def record(self, latency: float, response: httpx.Response | None) -> None:
+        self.latencies.append(latency)
+        if response is None:
+            self.errors += 1
+            return
+        self.statuses[response.status_code] = (
+            self.statuses.get(response.status_code, 0) + 1
+        )
+        if response.status_code >= 500:
+            self.errors += 1
+        queries = response.headers.get(QUERY_COUNT_HEADER)
+        if queries is not None:
+            self.db_queries += int(queries)
+            self.db_samples += 1
+
+    def summary(self, elapsed: float) -> dict:
+        ordered = sorted(self.latencies)
+        return {
+            "requests": len(ordered),
+            "throughput_rps": round(len(ordered) / elapsed, 2) if elapsed else 0.0,
+            "errors": self.errors,
+            "status_codes": {str(k): v for k, v in sorted(self.statuses.items())},
+            "latency_ms": {
+                "p50": _percentile(ordered, 50),
+                "p95": _percentile(ordered, 95),
+                "p99": _percentile(ordered, 99),
+                "max": round(ordered[-1] * 1000, 3) if ordered else None,
+                "mean": (
+                    round(sum(ordered) / len(ordered) * 1000, 3) if ordered else None
+                ),
+            },
+            "db_queries_per_request": (
+                round(self.db_queries / self.db_samples, 2) if self.db_samples else None
+            ),
+        }
+
+
+def _percentile(ordered: list[float], pct: float) -> float | None:
+    """Nearest-rank percentile of sorted seconds, in milliseconds."""
+    if not ordered:
+        return None
+    rank = max(1, -(-len(ordered) * pct // 100))  # ceil without float error
+    return round(ordered[int(rank) - 1] * 1000, 3)
+
+
+# =========================================================
+#                  RUNNERS
+# =========================================================
+
+
+async def _timed(
+    workload: Workload, name: str, stats: dict, started: float, record: bool
+):
+    try:
+        response = await getattr(workload, name)()
+    except httpx.HTTPError:
+        response = None
+    if record:
+        stats[name].record(time.perf_counter() - started, response)
+
+
+async def run_closed_loop(
+    workload: Workload, mix: dict, concurrency: int, duration: float, warmup: float
+) -> tuple[dict, float, int]:
+    """N workers, each sending its next request as soon as the last returns."""
+    names, weights = list(mix), list(mix.values())
+    stats = {name: OperationStats() for name in names}
+    start = time.perf_counter()
+    measure_from = start + warmup
+    deadline = measure_from + duration
+
+    async def worker(seed: int) -> None:
+        rng = random.Random(seed)
+        while (now := time.perf_counter()) < deadline:
+            name = rng.choices(names, weights)[0]
+            await _timed(workload, name, stats, now, record=now >= measure_from)
+
+    await asyncio.gather(*(worker(workload.rng.random()) for _ in range(concurrency)))
+    return stats, time.perf_counter() - measure_from, 0
+
+
+async def run_open_loop(
+    workload: Workload,
+    mix: dict,
+    rps: float,
+    duration: float,
+    warmup: float,
+    max_in_flight: int,
+) -> tuple[dict, float, int]:
+    """Send at a fixed rate regardless of responses (latency from schedule)."""
+    names, weights = list(mix), list(mix.values())
+    stats = {name: OperationStats() for name in names}
+    in_flight = asyncio.Semaphore(max_in_flight)
+    tasks: set[asyncio.Task] = set()
+    dropped = 0
+
+    async def send(name: str, scheduled: float, record: bool) -> None:
+        async with in_flight:
+            await _timed(workload, name, stats, scheduled, record)
+
+    start = time.perf_counter()
+    measure_from = start + warmup
+    total = int((warmup + duration) * rps)
+    for i in range(total):
+        scheduled = start + i / rps
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if len(tasks) >= max_in_flight * 4:
+            dropped += 1  # generator can't keep up; don't queue unboundedly
+            continue
+        name = workload.rng.choices(names, weights)[0]
+        task = asyncio.create_task(send(name, scheduled, scheduled >= measure_from))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    if tasks:
+        await asyncio.gather(*tasks)
+    return stats, time.perf_counter() - measure_from, dropped
+
+
+# =========================================================
+#                  REPORTING
+# =========================================================
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_report(stats: dict, elapsed: float, dropped: int, config: dict) -> dict:
+    total = OperationStats()
+    for op in stats.values():
+        total.latencies += op.latencies
+        total.errors += op.errors
+        total.db_queries += op.db_queries
+        total.db_samples += op.db_samples
+        for code, count in op.statuses.items():
+            total.statuses[code] = total.statuses.get(code, 0) + count
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "config": config,
+        "elapsed_seconds": round(elapsed, 3),
+        "dropped_sends": dropped,
+        "overall": total.summary(elapsed),
+        "operations": {name: op.summary(elapsed) for name, op in stats.items()},
+    }
+
+
+def format_report(report: dict) -> str:
+    rows = [("overall", report["overall"])] + list(report["operations"].items())
+    lines = [
+        f"{'operation':<16}{'reqs':>8}{'rps':>10}{'p50':>9}{'p95':>9}"
+        f"{'p99':>9}{'max':>9}{'err':>6}{'q/req':>7}"
+    ]
+    for name, s in rows:
+        latency = "".join(
+            f"{s['latency_ms'][k] if s['latency_ms'][k] is not None else '-':>9}"
+            for k in ("p50", "p95", "p99", "max")
+        )
+        queries = s["db_queries_per_request"]
+        lines.append(
+            f"{name:<16}{s['requests']:>8}{s['throughput_rps']:>10}{latency}"
+            f"{s['errors']:>6}{queries if queries is not None else '-':>7}"
+        )
+    return "\n".join(lines) + "\n(latencies in ms)"
+
+
+def compare_reports(before: dict, after: dict) -> str:
+    """Side-by-side change in throughput and latency percentiles."""
+
+    def pct(old, new):
+        if not old or new is None:
+            return "n/a"
+        return f"{(new - old) / old * 100:+.1f}%"
+
+    lines = [
+        f"before: {before['meta'].get('git_commit')}  after: {after['meta'].get('git_commit')}",
+        f"{'operation':<16}{'rps':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'q/req':>10}",
+    ]
+    names = ["overall"] + [n for n in after["operations"] if n in before["operations"]]
+    for name in names:
+        old = before["overall"] if name == "overall" else before["operations"][name]
+        new = after["overall"] if name == "overall" else after["operations"][name]
+        lines.append(
+            f"{name:<16}{pct(old['throughput_rps'], new['throughput_rps']):>10}"
+            + "".join(
+                f"{pct(old['latency_ms'][k], new['latency_ms'][k]):>10}"
+                for k in ("p50", "p95", "p99")
+            )
+            + f"{pct(old['db_queries_per_request'], new['db_queries_per_request']):>10}"
+        )
+    return "\n".join(lines)
+
+
+# =========================================================
+#                  ENTRYPOINT
+# =========================================================
+
+
+def parse_mix(value: str) -> dict:
+    """Parse 'get_services=6,update_service=4' into operation weights."""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise ValueError(
+                f"Unknown operation {name!r}; choose from {list(DEFAULT_MIX)}"
+            )
+        mix[name] = float(weight or 1)
+    if not any(mix.values()):
+        raise ValueError("Mix needs at least one positive weight")
+    return {k: v for k, v in mix.items() if v > 0}
+
+
+@asynccontextmanager
+async def _in_process_client():
+    """
+    Client for a fresh app instance on a throwaway SQLite database, so runs
+    start from the same empty state and never write to the configured DB.
+    """
+    import app.models  # noqa: F401 - register tables on Base.metadata
+    from app.database import Base, get_db
+    from app.instrumentation import track_engine
+    from app.main import create_app
+    from app.models.service_revision import seed_services_revision
+
+    with tempfile.TemporaryDirectory(prefix="loadtest-") as tmp:
+        engine = create_engine(
+            f"sqlite:///{tmp}/loadtest.db",
+            connect_args={"check_same_thread": False},
+        )
+        track_engine(engine)
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+        with Session() as db:
+            seed_services_revision(db)
+            db.commit()
+
+        def get_loadtest_db():
+            db = Session()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        application = create_app(query_count_header=True)
+        application.dependency_overrides[get_db] = get_loadtest_db
+        transport = httpx.ASGITransport(app=application)
+        try:
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://loadtest"
+            ) as client:
+                yield client
+        finally:
+            engine.dispose()
+
+
+async def run(args) -> dict:
+    mix = parse_mix(args.mix) if args.mix else dict(DEFAULT_MIX)
+    if args.url:
+        client = httpx.AsyncClient(
+            base_url=args.url,
+            timeout=args.timeout,
+            limits=httpx.Limits(max_connections=max(args.concurrency, 100)),
+        )
+    else:
+        client = _in_process_client()
+
+    async with client as client:
+        workload = Workload(client, random.Random(args.seed))
+        await workload.seed(args.seed_rows)
+        if args.rps:
+            stats, elapsed, dropped = await run_open_loop(
+                workload, mix, args.rps, args.duration, args.warmup, args.concurrency
+            )
+        else:
+            stats, elapsed, dropped = await run_closed_loop(
+                workload, mix, args.concurrency, args.duration, args.warmup
+            )
+
+    config = {
+        "target": args.url or "in-process",
+        "mode": "open-loop" if args.rps else "closed-loop",
+        "concurrency": args.concurrency,
+        "rps": args.rps,
+        "duration": args.duration,
+        "warmup": args.warmup,
+        "mix": mix,
+        "seed": args.seed,
+        "seed_rows": args.seed_rows,
+    }
+    return build_report(stats, elapsed, dropped, config)
+
+
+def main():
+    """CLI entrypoint — runs a load test and prints a latency report."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Load-test the services CRUD API.")
+    parser.add_argument(
+        "--url",
+        help="Base URL of a running server backed by a disposable DB (rows "
+        "are created and not cleaned up). Default: in-process, temp SQLite.",
+    )
+    parser.add_argument(
+        "--duration", type=float, default=10.0, help="Measured seconds."
+    )
+    parser.add_argument(
+        "--warmup", type=float, default=2.0, help="Unmeasured seconds first."
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=8,
+        help="Workers (closed loop) or max in-flight requests (open loop).",
+    )
+    parser.add_argument("--rps", type=float, help="Target request rate (open loop).")
+    parser.add_argument(
+        "--mix",
+        help="Operation weights, e.g. get_services=6,create_service=1,update_service=3",
+    )
+    parser.add_argument("--seed", type=int, default=1, help="Random seed.")
+    parser.add_argument(
+        "--seed-rows", type=int, default=20, help="Services created first."
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=30.0, help="Per-request timeout (s)."
+    )
+    parser.add_argument("--json", metavar="PATH", help="Write the full report to PATH.")
+    parser.add_argument(
+        "--compare",
+        nargs=2,
+        metavar=("BEFORE", "AFTER"),
+        help="Compare two saved reports instead of running.",
+    )
+    args = parser.parse_args()
+
+    if args.compare:
+        before, after = (
+            json.loads(Path(p).read_text(encoding="utf-8")) for p in args.compare
+        )
+        print(compare_reports(before, after))
+        return
+
+    try:
+        report = asyncio.run(run(args))
+    except (ValueError, RuntimeError, httpx.HTTPError) as e:
+        print(f"❌ Load test failed: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(format_report(report))
+
+
+if __name__ == "__main__":
+    main()
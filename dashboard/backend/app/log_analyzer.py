@@ -9,16 +9,33 @@ Highlights:
 - Compatible with Linux & Windows file paths
 - Graceful fallback if the log file doesn't exist
 - Provides status, endpoint, and IP frequency analysis
+- Streaming error-rate anomaly detection in the same pass
+- Sampled mode: estimates with confidence intervals under a byte/time budget
+- Byte-offset index (status / IP / time bucket) for fast raw-line drill-down
 
 Author: Akshat Kushwaha
 """
 
+import asyncio
+import hashlib
 import json
+import math
+import os
+import random
 import re
-from collections import Counter
+import tempfile
+import threading
+import time
+from array import array
+from bisect import bisect_right
+from collections import Counter, OrderedDict
+from datetime import datetime, timezone
+from itertools import islice
 from pathlib import Path
 from typing import Union
 
+from app.anomaly import ErrorRateDetector, log_time_to_epoch
+
 # Flexible regex — supports IPv4/IPv6 and common Nginx log formats
 LOG_PATTERN = re.compile(
     r"(?P<ip>[0-9a-fA-F\.:]+) - - \[(?P<time>[^\]]+)\] "
@@ -26,6 +43,8 @@ LOG_PATTERN = re.compile(
     r"(?P<status>\d{3})"
 )
 
+LOG_PATTERN_BYTES = re.compile(LOG_PATTERN.pattern.encode())
+
 # Default fallback path (Windows-safe)
 DEFAULT_LOG_PATH = Path("app/test_logs/access.log")
 
@@ -86,8 +105,21 @@ DEFAULT_LOG_PATH = Path("app/test_logs/access.log")
 #         },
 #     }
 #
-def analyze_logs(log_path: str | Path) -> dict:
-    """Analyze an Nginx access log file and return aggregated stats."""
+def analyze_logs(
+    log_path: str | Path,
+    detector: ErrorRateDetector | None = None,
+    sample_bytes: int | None = None,
+    sample_seconds: float | None = None,
+    seed: int | None = None,
+) -> dict:
+    """
+    Analyze an Nginx access log file and return aggregated stats.
+    With `sample_bytes` / `sample_seconds`, return sampled estimates with
+    95% confidence intervals instead (see sample_logs).
+    """
+
+    if sample_bytes is not None or sample_seconds is not None:
+        return sample_logs(log_path, sample_bytes, sample_seconds, seed=seed)
 
     log_path = Path(log_path)
     if not log_path.exists():
@@ -97,6 +129,9 @@ def analyze_logs(log_path: str | Path) -> dict:
     status_counts = Counter()
     ip_counts = Counter()
     endpoint_counts = Counter()
+    # Error-rate anomalies are detected in the same pass (O(1) state per key).
+    detector = detector or ErrorRateDetector()
+    last_time, last_epoch = None, None
 
     try:
         with log_path.open("r", encoding="utf-8", errors="ignore") as f:
@@ -110,6 +145,12 @@ def analyze_logs(log_path: str | Path) -> dict:
                 status_counts[entry["status"]] += 1
                 ip_counts[entry["ip"]] += 1
                 endpoint_counts[entry["request"]] += 1
+
+                if entry["time"] != last_time:
+                    last_time = entry["time"]
+                    last_epoch = log_time_to_epoch(last_time)
+                detector.observe(last_epoch, entry["request"], entry["status"])
+        detector.finish()
     except Exception as e:
         return {"error": f"Failed to read log file: {e}"}
 
@@ -126,9 +167,835 @@ def analyze_logs(log_path: str | Path) -> dict:
             for code, count in status_counts.items()
             if code.startswith(("4", "5"))
         },
+        "anomalies": detector.summary(),
+    }
+
+
+MAX_READ_PER_POLL = 4 << 20  # characters parsed per tail step (bounds one step)
+
+
+class _LogTailer:
+    """
+    Incremental reader for one live log feeding one detector. Blocking: its
+    methods are meant to run in a worker thread, never on the event loop.
+    """
+
+    def __init__(
+        self,
+        log_path: Path,
+        detector: ErrorRateDetector,
+        prime_bytes: int,
+        max_read: int = MAX_READ_PER_POLL,
+    ) -> None:
+        self.log_path = log_path
+        self.detector = detector
+        self.prime_bytes = prime_bytes
+        self.max_read = max_read
+        self.f = None
+        self.inode: int | None = None
+        self.pending = ""
+
+    def _open(self) -> None:
+        if self.f is not None:
+            self.f.close()
+        self.f = self.log_path.open("r", encoding="utf-8", errors="ignore")
+        self.inode = os.fstat(self.f.fileno()).st_ino
+        self.pending = ""
+
+    def _feed(self, chunk: str) -> list[dict]:
+        raised = []
+        for line in chunk.splitlines():
+            match = LOG_PATTERN.search(line)
+            if match:
+                raised += self.detector.observe(
+                    log_time_to_epoch(match["time"]), match["request"], match["status"]
+                )
+        return raised
+
+    def prime(self) -> None:
+        """Seed the baselines from the last `prime_bytes` (nothing is emitted)."""
+        self._open()
+        self.f.seek(max(0, os.fstat(self.f.fileno()).st_size - self.prime_bytes))
+        if self.f.tell():
+            self.f.readline()  # realign to a line boundary
+        while True:
+            chunk = self.f.read(self.max_read)
+            if not chunk:
+                break
+            chunk, _, self.pending = (self.pending + chunk).rpartition("\n")
+            self._feed(chunk)
+
+    def poll(self) -> tuple[list[dict], bool]:
+        """
+        Parse at most `max_read` new characters. Returns the anomalies raised
+        and whether more input is already waiting (so the caller skips its sleep).
+        """
+        data = self.f.read(self.max_read)
+        if data:
+            chunk, _, self.pending = (self.pending + data).rpartition("\n")
+            return self._feed(chunk), len(data) == self.max_read
+        try:
+            st = self.log_path.stat()
+        except FileNotFoundError:
+            st = None  # rotated away, new file not created yet
+        if st is not None and st.st_ino != self.inode:
+            # Rotated (logrotate rename/create): the old file is fully
+            # drained (read() came back empty), switch over.
+            self._open()
+            return [], True
+        if st is not None and st.st_size < self.f.tell():
+            self.f.seek(0)  # truncated in place (copytruncate)
+            self.pending = ""
+        return self.detector.advance(int(time.time())), False
+
+    def close(self) -> None:
+        if self.f is not None:
+            self.f.close()
+            self.f = None
+
+
+async def follow_anomalies(
+    log_path: str | Path,
+    poll_interval: float = 1.0,
+    prime_bytes: int = 1 << 20,
+    heartbeat: float = 15.0,
+    detector: ErrorRateDetector | None = None,
+):
+    """
+    Tail a live log and yield anomalies as their windows close.
+
+    Reading and parsing run in a worker thread, at most MAX_READ_PER_POLL
+    characters per step, so a burst of appended lines never stalls the
+    event loop. The last `prime_bytes` of the file seed the baselines
+    (nothing is emitted for them). Yields None as a keep-alive every
+    `heartbeat` s. Follows rotation (new inode at `log_path`) and in-place
+    truncation. API clients share one tailer per log via subscribe_anomalies().
+    """
+    tailer = _LogTailer(Path(log_path), detector or ErrorRateDetector(), prime_bytes)
+    try:
+        await asyncio.to_thread(tailer.prime)
+        last_emit = time.monotonic()
+        while True:
+            raised, more = await asyncio.to_thread(tailer.poll)
+            for anomaly in raised:
+                last_emit = time.monotonic()
+                yield anomaly
+            if time.monotonic() - last_emit >= heartbeat:
+                last_emit = time.monotonic()
+                yield None
+            if not more:
+                await asyncio.sleep(poll_interval)
+    finally:
+        tailer.close()
+
+
+class _AnomalyFeed:
+    """One follow_anomalies() task per log, fanned out to subscriber queues."""
+
+    def __init__(self, log_path: Path, max_queued: int = 100) -> None:
+        self.log_path = log_path
+        self.max_queued = max_queued
+        self.subscribers: set[asyncio.Queue] = set()
+        self.task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        try:
+            async for anomaly in follow_anomalies(self.log_path, heartbeat=math.inf):
+                for queue in self.subscribers:
+                    self._offer(queue, anomaly)
+        except Exception as e:  # e.g. the log was removed: end every stream
+            for queue in self.subscribers:
+                self._offer(queue, e)
+            _ANOMALY_FEEDS.pop(self.log_path, None)
+
+    def _offer(self, queue: asyncio.Queue, item) -> None:
+        if queue.full():
+            queue.get_nowait()  # slow client: drop its oldest event
+        queue.put_nowait(item)
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.max_queued)
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self.subscribers.discard(queue)
+        if not self.subscribers:
+            self.task.cancel()
+            if _ANOMALY_FEEDS.get(self.log_path) is self:
+                del _ANOMALY_FEEDS[self.log_path]
+
+
+# Live feeds of the running event loop, keyed by resolved log path.
+_ANOMALY_FEEDS: dict[Path, _AnomalyFeed] = {}
+
+
+async def subscribe_anomalies(log_path: str | Path, heartbeat: float = 15.0):
+    """
+    Anomalies for `log_path` from the feed shared by every subscriber in
+    this process (one tailer and detector per log, however many clients).
+    Yields None as a keep-alive every `heartbeat` s without events.
+    """
+    key = Path(log_path).resolve()
+    feed = _ANOMALY_FEEDS.get(key)
+    if feed is None or feed.task.done():
+        feed = _ANOMALY_FEEDS[key] = _AnomalyFeed(key)
+    queue = feed.subscribe()
+    try:
+        while True:
+            try:
+                item = await asyncio.wait_for(queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield None
+                continue
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        feed.unsubscribe(queue)
+
+
+# =========================================================
+#                  SAMPLED (APPROXIMATE) ANALYTICS
+# =========================================================
+
+Z_95 = 1.959964  # two-sided 95% normal quantile
+# Student-t 95% quantiles for df 1..30 (few blocks sampled -> wider intervals)
+# fmt: off
+T_95 = (
+    12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042,
+)
+# fmt: on
+# One-sided 95% Poisson upper bound on the mean after observing zero events.
+ZERO_EVENTS_UPPER_95 = 2.996
+SAMPLE_BLOCK_SIZE = 256 * 1024
+
+
+class _BlockTotals:
+    """Running sum and sum of squares of per-block counts, for one key family."""
+
+    __slots__ = ("sums", "squares")
+
+    def __init__(self) -> None:
+        self.sums = Counter()
+        self.squares = Counter()
+
+    def add_block(self, counts: Counter) -> None:
+        for key, count in counts.items():
+            self.sums[key] += count
+            self.squares[key] += count * count
+
+
+def _estimate_total(
+    total: int, squares: int, n: int, blocks: int, exact: int = 0
+) -> dict:
+    """
+    Expansion estimate of a population total from n of `blocks` equal-size
+    blocks sampled without replacement, with a 95% interval.
+    `exact` is a count known without sampling (the tail block).
+
+    Only a full read is exact. Otherwise the per-block variance is floored
+    at the Poisson variance (the per-block mean), so identical sampled
+    blocks can't produce a zero-width interval, and a key absent from every
+    sampled block gets [exact, exact + upper bound for the unread blocks].
+    """
+    estimate = exact + (blocks * total / n if n else 0)
+    if n >= blocks:
+        stderr = 0.0  # every block read: the answer is exact
+    elif n < 2:
+        stderr = float("inf")
+    elif total == 0:
+        upper = exact + ZERO_EVENTS_UPPER_95 * (blocks - n) / n
+        return {"estimate": exact, "ci95": [exact, math.ceil(upper)], "stderr": None}
+    else:
+        variance = (squares - total * total / n) / (n - 1)
+        variance = max(variance, total / n)
+        stderr = blocks * math.sqrt(variance / n * (1 - n / blocks))
+    margin = (T_95[n - 2] if 2 <= n <= len(T_95) + 1 else Z_95) * stderr
+    return {
+        "estimate": round(estimate),
+        "ci95": (
+            [max(exact, round(estimate - margin)), round(estimate + margin)]
+            if math.isfinite(margin)
+            else [exact, None]
+        ),
+        "stderr": round(stderr, 2) if math.isfinite(stderr) else None,
+    }
+
+
+def _read_block(f, start: int, end: int, size: int):
+    """Yield lines that *start* inside [start, end) — each line belongs to one block."""
+    if start:
+        f.seek(start - 1)
+        f.readline()  # realign: finish the line straddling the boundary
+    else:
+        f.seek(0)
+    pos = f.tell()
+    while pos < end and pos < size:
+        line = f.readline()
+        if not line:
+            return
+        pos += len(line)
+        yield line
+
+
+def sample_logs(
+    log_path: str | Path,
+    budget_bytes: int | None = None,
+    budget_seconds: float | None = None,
+    block_size: int = SAMPLE_BLOCK_SIZE,
+    seed: int | None = None,
+    top: int = 5,
+) -> dict:
+    """
+    Estimate request totals, status mix and top endpoints/IPs from randomly
+    chosen blocks of the file, stopping at the byte and/or time budget.
+    Intervals shrink as the budget grows and collapse to the exact answer
+    once every block has been read. `unseen_status_bound` is the interval
+    for any status code that appeared in no sampled block.
+    """
+
+    log_path = Path(log_path)
+    if not log_path.exists():
+        return {"error": f"Log file not found: {log_path}"}
+    if budget_bytes is None and budget_seconds is None:
+        return {"error": "Sampling needs a byte or time budget."}
+
+    size = log_path.stat().st_size
+    # Equal-size blocks are sampled; the short tail block (if any) is always
+    # read in full and added exactly, so it doesn't skew the estimator.
+    blocks, tail = divmod(size, block_size)
+    order = list(range(blocks))
+    random.Random(seed).shuffle(order)
+
+    requests = _BlockTotals()
+    statuses = _BlockTotals()
+    endpoints = _BlockTotals()
+    ips = _BlockTotals()
+    exact = [Counter(), Counter(), Counter(), Counter()]  # tail block counts
+
+    def scan(f, start: int, counters) -> int:
+        read = 0
+        block_requests, block_statuses, block_endpoints, block_ips = counters
+        for line in _read_block(f, start, start + block_size, size):
+            read += len(line)
+            match = LOG_PATTERN_BYTES.search(line)
+            if not match:
+                continue
+            block_requests["total"] += 1
+            block_statuses[match["status"].decode()] += 1
+            block_endpoints[match["request"].decode("utf-8", "ignore")] += 1
+            block_ips[match["ip"].decode()] += 1
+        return read
+
+    started = time.perf_counter()
+    n = 0
+    try:
+        with log_path.open("rb") as f:
+            bytes_read = scan(f, blocks * block_size, exact) if tail else 0
+            for block in order:
+                if n >= 2 and (
+                    (budget_bytes is not None and bytes_read >= budget_bytes)
+                    or (
+                        budget_seconds is not None
+                        and time.perf_counter() - started >= budget_seconds
+                    )
+                ):
+                    break
+                counters = [Counter(), Counter(), Counter(), Counter()]
+                bytes_read += scan(f, block * block_size, counters)
+                for totals, counts in zip(
+                    (requests, statuses, endpoints, ips), counters
+                ):
+                    totals.add_block(counts)
+                n += 1
+    except Exception as e:
+        return {"error": f"Failed to read log file: {e}"}
+
+    families = dict(zip(("requests", "statuses", "endpoints", "ips"), exact))
+
+    def estimate(totals: _BlockTotals, family: str, key) -> dict:
+        return _estimate_total(
+            totals.sums[key], totals.squares[key], n, blocks, families[family][key]
+        )
+
+    def top_keys(totals: _BlockTotals, family: str) -> list:
+        ranked = (
+            Counter({k: v * blocks / n for k, v in totals.sums.items()})
+            if n
+            else Counter()
+        ) + families[family]
+        return [
+            [key, estimate(totals, family, key)] for key, _ in ranked.most_common(top)
+        ]
+
+    # Codes seen only in the tail block are reported with a [tail, x] interval.
+    codes = set(statuses.sums) | set(families["statuses"])
+    status_counts = {
+        code: estimate(statuses, "statuses", code) for code in sorted(codes)
+    }
+    return {
+        "log_file": str(log_path),
+        "mode": "sampled",
+        "confidence": 0.95,
+        "sampled_blocks": n,
+        "total_blocks": blocks,
+        "sampled_fraction": round(bytes_read / size, 6) if size else 1.0,
+        "bytes_read": bytes_read,
+        "elapsed_seconds": round(time.perf_counter() - started, 3),
+        "total_requests": estimate(requests, "requests", "total"),
+        "status_counts": status_counts,
+        "unseen_status_bound": _estimate_total(0, 0, n, blocks),
+        "top_ips": top_keys(ips, "ips"),
+        "top_endpoints": top_keys(endpoints, "endpoints"),
+        "error_summary": {
+            code: value
+            for code, value in status_counts.items()
+            if code.startswith(("4", "5"))
+        },
     }
 
 
+# =========================================================
+#                  BYTE-OFFSET INDEX (DRILL-DOWN)
+# =========================================================
+
+LOG_TIME_FORMAT = "%d/%b/%Y:%H:%M:%S %z"
+INDEX_FORMAT_VERSION = 1
+
+
+def _parse_log_time(value: str) -> datetime | None:
+    try:
+        return datetime.strptime(value, LOG_TIME_FORMAT)
+    except ValueError:
+        return None
+
+
+class PostingList:
+    """
+    Append-only sorted list of byte offsets, stored as varint-encoded deltas.
+    A checkpoint every SKIP_EVERY entries lets readers jump close to a target
+    offset instead of decoding from the start.
+    """
+
+    SKIP_EVERY = 128
+    __slots__ = ("data", "last", "count", "skip_values", "skip_bases", "skip_positions")
+
+    def __init__(self) -> None:
+        self.data = bytearray()
+        self.last = 0
+        self.count = 0
+        self.skip_values = array("Q")  # value of the entry at each checkpoint
+        self.skip_bases = array("Q")  # value preceding it (delta base)
+        self.skip_positions = array("Q")  # byte position of that entry in data
+
+    def append(self, offset: int) -> None:
+        if self.count % self.SKIP_EVERY == 0:
+            self.skip_values.append(offset)
+            self.skip_bases.append(self.last)
+            self.skip_positions.append(len(self.data))
+        delta = offset - self.last
+        while delta >= 0x80:
+            self.data.append((delta & 0x7F) | 0x80)
+            delta >>= 7
+        self.data.append(delta)
+        self.last = offset
+        self.count += 1
+
+    def cursor(self) -> "PostingCursor":
+        return PostingCursor(self)
+
+    def __iter__(self):
+        cursor = self.cursor()
+        value = cursor.next()
+        while value is not None:
+            yield value
+            value = cursor.next()
+
+    def __len__(self) -> int:
+        return self.count
+
+
+class PostingCursor:
+    """Forward-only reader over a PostingList with checkpoint-based seek."""
+
+    __slots__ = ("plist", "pos", "value", "current")
+
+    def __init__(self, plist: PostingList) -> None:
+        self.plist = plist
+        self.pos = 0
+        self.value = 0
+        self.current: int | None = None  # last value returned
+
+    def next(self) -> int | None:
+        data = self.plist.data
+        if self.pos >= len(data):
+            self.current = None
+            return None
+        delta = shift = 0
+        while True:
+            byte = data[self.pos]
+            self.pos += 1
+            delta |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                break
+            shift += 7
+        self.value += delta
+        self.current = self.value
+        return self.value
+
+    def seek(self, target: int) -> int | None:
+        """Return the first offset >= target (never moves backwards)."""
+        if self.current is not None and self.current >= target:
+            return self.current
+        plist = self.plist
+        i = bisect_right(plist.skip_values, target) - 1
+        if i >= 0 and plist.skip_positions[i] > self.pos:
+            self.pos = plist.skip_positions[i]
+            self.value = plist.skip_bases[i]
+        value = self.next()
+        while value is not None and value < target:
+            value = self.next()
+        return value
+
+
+def _intersect(plists: list[PostingList], start: int):
+    """Yield offsets >= start present in every posting list (merge with seeks)."""
+    plists = sorted(plists, key=len)
+    cursors = [p.cursor() for p in plists]
+    candidate = cursors[0].seek(start)
+    while candidate is not None:
+        for cursor in cursors[1:]:
+            found = cursor.seek(candidate)
+            if found is None:
+                return
+            if found != candidate:
+                candidate = cursors[0].seek(found)
+                break
+        else:
+            yield candidate
+            candidate = cursors[0].next()
+
+
+class LogIndex:
+    """
+    Byte-offset index over an access log: posting lists per status code and
+    per client IP, plus the offset range covered by each time bucket.
+
+    update() only reads bytes appended since the previous call; truncation
+    or rotation (different inode) triggers a rebuild.
+    """
+
+    def __init__(self, log_path: str | Path, bucket_seconds: int = 60) -> None:
+        self.log_path = Path(log_path)
+        self.bucket_seconds = bucket_seconds
+        self._reset()
+
+    def _reset(self) -> None:
+        self.identity: int | None = None
+        self.indexed_bytes = 0
+        self.lines = 0
+        self.postings: dict[tuple[str, str], PostingList] = {}
+        # bucket id -> [first_offset, last_offset]
+        self.buckets: dict[int, list[int]] = {}
+
+    # ------------------------------------------------------------------ build
+    def update(self) -> int:
+        """Index lines appended since the last call; returns lines added."""
+        st = self.log_path.stat()
+        if self.identity != st.st_ino or st.st_size < self.indexed_bytes:
+            self._reset()
+            self.identity = st.st_ino
+        if st.st_size == self.indexed_bytes:
+            return 0
+
+        postings = self.postings
+        buckets = self.buckets
+        added = 0
+        last_time_raw = None
+        bucket = None
+        offset = self.indexed_bytes
+        with self.log_path.open("rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # partial line still being written; index it next time
+                match = LOG_PATTERN_BYTES.search(line)
+                if match:
+                    status = match["status"].decode()
+                    ip = match["ip"].decode()
+                    for key in (("status", status), ("ip", ip)):
+                        plist = postings.get(key)
+                        if plist is None:
+                            plist = postings[key] = PostingList()
+                        plist.append(offset)
+
+                    time_raw = match["time"]
+                    if time_raw != last_time_raw:
+                        last_time_raw = time_raw
+                        ts = _parse_log_time(time_raw.decode())
+                        bucket = (
+                            int(ts.timestamp()) // self.bucket_seconds if ts else None
+                        )
+                    if bucket is not None:
+                        span = buckets.get(bucket)
+                        if span is None:
+                            buckets[bucket] = [offset, offset]
+                        else:
+                            span[1] = offset
+                    added += 1
+                offset += len(line)
+        self.indexed_bytes = offset
+        self.lines += added
+        return added
+
+    # ------------------------------------------------------------------ query
+    def _offset_range(
+        self, since: datetime | None, until: datetime | None
+    ) -> tuple[int, int] | None:
+        """Byte range covering every bucket that overlaps [since, until]."""
+        if since is None and until is None:
+            return 0, self.indexed_bytes
+        lo_bucket = int(since.timestamp()) // self.bucket_seconds if since else None
+        hi_bucket = int(until.timestamp()) // self.bucket_seconds if until else None
+        spans = [
+            span
+            for b, span in self.buckets.items()
+            if (lo_bucket is None or b >= lo_bucket)
+            and (hi_bucket is None or b <= hi_bucket)
+        ]
+        if not spans:
+            return None
+        return min(s[0] for s in spans), max(s[1] for s in spans)
+
+    def search(
+        self,
+        status: str | None = None,
+        ip: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        cursor: int = 0,
+    ):
+        """Yield (offset, line) for matching lines at or after byte `cursor`."""
+        since = _as_utc(since)
+        until = _as_utc(until)
+        span = self._offset_range(since, until)
+        if span is None:
+            return
+        lo, hi = span
+
+        keys = [("status", status), ("ip", ip)]
+        plists = []
+        for key in keys:
+            if key[1] is None:
+                continue
+            plist = self.postings.get(key)
+            if plist is None:
+                return
+            plists.append(plist)
+
+        start = max(lo, cursor)
+        with self.log_path.open("rb") as f:
+            if plists:
+                offsets = _intersect(plists, start)
+            else:
+                offsets = self._sequential_offsets(f, start, hi)
+            for offset in offsets:
+                if offset > hi:
+                    return
+                f.seek(offset)
+                raw = f.readline()
+                line = raw.decode("utf-8", errors="ignore").rstrip("\r\n")
+                match = LOG_PATTERN.search(line)
+                if not match:
+                    continue  # only ever return access log lines
+                if since or until:
+                    ts = _parse_log_time(match["time"])
+                    if ts is None or (since and ts < since) or (until and ts > until):
+                        continue
+                yield offset, line
+
+    def _sequential_offsets(self, f, start: int, hi: int):
+        # Time-only queries: walk the line starts inside the bucket range.
+        offset = start
+        f.seek(offset)
+        while offset <= hi:
+            raw = f.readline()
+            if not raw:
+                return
+            yield offset
+            offset += len(raw)
+            f.seek(offset)
+
+    # ------------------------------------------------------------------ persistence
+    def save(self, path: str | Path) -> None:
+        """Write the index next to the log so later runs only index new bytes."""
+        keys = list(self.postings.items())
+        header = {
+            "version": INDEX_FORMAT_VERSION,
+            "log_path": str(self.log_path),
+            "identity": self.identity,
+            "indexed_bytes": self.indexed_bytes,
+            "lines": self.lines,
+            "bucket_seconds": self.bucket_seconds,
+            "buckets": [[b, s[0], s[1]] for b, s in self.buckets.items()],
+            "postings": [
+                [kind, value, p.count, p.last, len(p.data), len(p.skip_values)]
+                for (kind, value), p in keys
+            ],
+        }
+        path = Path(path)
+        # Atomic swap: other workers may be loading the same file.
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(json.dumps(header).encode() + b"\n")
+                for _, p in keys:
+                    f.write(p.data)
+                    p.skip_values.tofile(f)
+                    p.skip_bases.tofile(f)
+                    p.skip_positions.tofile(f)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+    @classmethod
+    def load(cls, log_path: str | Path, path: str | Path) -> "LogIndex":
+        """Load a saved index; returns a fresh one if it's missing or stale."""
+        index = cls(log_path)
+        try:
+            with Path(path).open("rb") as f:
+                header = json.loads(f.readline())
+                if header.get("version") != INDEX_FORMAT_VERSION or header.get(
+                    "log_path"
+                ) != str(index.log_path):
+                    return index
+                index.bucket_seconds = header["bucket_seconds"]
+                index.identity = header["identity"]
+                index.indexed_bytes = header["indexed_bytes"]
+                index.lines = header["lines"]
+                index.buckets = {b: [lo, hi] for b, lo, hi in header["buckets"]}
+                for kind, value, count, last, size, skips in header["postings"]:
+                    p = PostingList()
+                    p.data = bytearray(f.read(size))
+                    p.count, p.last = count, last
+                    for arr in (p.skip_values, p.skip_bases, p.skip_positions):
+                        arr.fromfile(f, skips)
+                    index.postings[(kind, value)] = p
+        except (OSError, ValueError, KeyError, EOFError):
+            return cls(log_path)
+        return index
+
+
+def _as_utc(value: datetime | None) -> datetime | None:
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _default_index_dir() -> Path:
+    return Path(tempfile.gettempdir()) / "devops-lab-log-index"
+
+
+class _IndexEntry:
+    """One warm index, with its own lock so slow builds only block that log."""
+
+    __slots__ = ("lock", "index", "saved_lines")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.index: LogIndex | None = None
+        self.saved_lines = 0
+
+
+# Indexes kept warm between API calls, keyed by resolved log path (LRU).
+# They are also saved under LOG_INDEX_DIR, so a restarted worker resumes
+# from the last save instead of rescanning the whole log.
+MAX_LOG_INDEXES = 8
+SAVE_EVERY_LINES = 10_000
+_LOG_INDEXES: OrderedDict[Path, _IndexEntry] = OrderedDict()
+_LOG_INDEXES_LOCK = threading.Lock()  # guards the registry only
+
+
+def _index_file(log_path: Path) -> Path:
+    directory = Path(os.getenv("LOG_INDEX_DIR") or _default_index_dir())
+    directory.mkdir(parents=True, exist_ok=True)
+    key = hashlib.blake2b(str(log_path).encode(), digest_size=8).hexdigest()
+    return directory / f"{log_path.name}.{key}.idx"
+
+
+def _index_entry(key: Path) -> _IndexEntry:
+    """Registry lookup (LRU); building and searching happen outside this lock."""
+    with _LOG_INDEXES_LOCK:
+        entry = _LOG_INDEXES.get(key)
+        if entry is None:
+            if len(_LOG_INDEXES) >= MAX_LOG_INDEXES:
+                _LOG_INDEXES.popitem(last=False)
+            entry = _LOG_INDEXES[key] = _IndexEntry()
+        else:
+            _LOG_INDEXES.move_to_end(key)
+    return entry
+
+
+def search_logs(
+    log_path: str | Path,
+    status: str | None = None,
+    ip: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    cursor: int = 0,
+    limit: int = 100,
+) -> dict:
+    """Return one page of raw log lines matching the filters, via the index."""
+
+    log_path = Path(log_path)
+    if not log_path.exists():
+        return {"error": f"Log file not found: {log_path}"}
+
+    key = log_path.resolve()
+    entry = _index_entry(key)
+    try:
+        with entry.lock:
+            if entry.index is None:
+                index_file = _index_file(key)
+                entry.index = LogIndex.load(key, index_file)
+                entry.saved_lines = entry.index.lines
+            index = entry.index
+            index.update()
+            # Persist once enough new lines have piled up (not every query).
+            if index.lines - entry.saved_lines >= max(
+                SAVE_EVERY_LINES, entry.saved_lines // 10
+            ):
+                index.save(_index_file(key))
+                entry.saved_lines = index.lines
+            matches = list(
+                islice(index.search(status, ip, since, until, cursor), limit + 1)
+            )
+    except Exception as e:
+        return {"error": f"Failed to read log file: {e}"}
+
+    page = matches[:limit]
+    return {
+        "log_file": str(log_path),
+        "count": len(page),
+        "lines": [{"offset": offset, "line": line} for offset, line in page],
+        # Pass back as `cursor` to fetch the next page; None when exhausted.
+        "next_cursor": matches[limit][0] if len(matches) > limit else None,
+    }
+
+
+def _parse_size(value: str) -> int:
+    """Parse '512K', '64M', '2G' or plain byte counts."""
+    units = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+    value = value.strip().upper().removesuffix("B")
+    if value and value[-1] in units:
+        return int(float(value[:-1]) * units[value[-1]])
+    return int(value)
+
+
 def main():
     """CLI entrypoint — can be used independently on Windows or Linux."""
     import argparse
@@ -142,10 +1009,66 @@ def main():
         default=str(DEFAULT_LOG_PATH),
         help="Path to log file (defaults to app/test_logs/access.log if missing).",
     )
+    sampling = parser.add_argument_group("sampling (approximate, with 95% CIs)")
+    sampling.add_argument(
+        "--sample-bytes",
+        type=_parse_size,
+        help="Read at most this many bytes of random blocks (e.g. 64M, 1G).",
+    )
+    sampling.add_argument(
+        "--sample-seconds", type=float, help="Stop sampling after this many seconds."
+    )
+    sampling.add_argument(
+        "--seed", type=int, help="Random seed for reproducible samples."
+    )
+    search = parser.add_argument_group("drill-down (prints matching raw lines)")
+    search.add_argument("--status", help="Only lines with this status code.")
+    search.add_argument("--ip", help="Only lines from this client IP.")
+    search.add_argument(
+        "--since", type=datetime.fromisoformat, help="ISO time, inclusive."
+    )
+    search.add_argument(
+        "--until", type=datetime.fromisoformat, help="ISO time, inclusive."
+    )
+    search.add_argument("--limit", type=int, default=100, help="Lines per page.")
+    search.add_argument(
+        "--cursor", type=int, default=0, help="Byte offset to resume at."
+    )
+    search.add_argument(
+        "--index-file", help="Persist the index here (default: <logfile>.idx)."
+    )
     args = parser.parse_args()
 
-    result = analyze_logs(args.logfile)
-    print(json.dumps(result, indent=2))
+    if not any((args.status, args.ip, args.since, args.until)):
+        result = analyze_logs(
+            args.logfile,
+            sample_bytes=args.sample_bytes,
+            sample_seconds=args.sample_seconds,
+            seed=args.seed,
+        )
+        print(json.dumps(result, indent=2))
+        return
+
+    import sys
+
+    log_path = Path(args.logfile)
+    if not log_path.exists():
+        print(json.dumps({"error": f"Log file not found: {log_path}"}, indent=2))
+        return
+    index_file = Path(args.index_file or f"{log_path}.idx")
+    index = LogIndex.load(log_path, index_file)
+    if index.update() or not index_file.exists():
+        index.save(index_file)
+
+    matches = index.search(args.status, args.ip, args.since, args.until, args.cursor)
+    next_cursor = None
+    for n, (offset, line) in enumerate(matches):
+        if n == args.limit:
+            next_cursor = offset
+            break
+        print(line)
+    if next_cursor is not None:
+        print(f"next cursor: {next_cursor}", file=sys.stderr)
 
 
 if __name__ == "__main__":
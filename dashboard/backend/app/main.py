@@ -13,28 +13,47 @@ Provides:
 Author: Akshat Kushwaha
 """
 
-from datetime import datetime
+import asyncio
+import hashlib
+import json
+import os
+import warnings
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
 from pathlib import Path
 from typing import List
 
-from fastapi import Depends, FastAPI, HTTPException, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    FastAPI,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
+from sqlalchemy import func, literal, select
 from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app.log_analyzer import analyze_logs
+from app.compression import CompressionMiddleware
+from app.database import dispose_engine, get_db, load_env, warm_pool
+from app.instrumentation import QueryCountMiddleware
 from app.models.service_model import Service
-
-# =========================================================
-#                  FASTAPI APP CONFIG
-# =========================================================
-
-app = FastAPI(
-    title="DevOps Lab API",
-    version="2.1.0",
-    description="A FastAPI-based DevOps monitoring and analytics backend powered by PostgreSQL.",
+from app.models.service_revision import (
+    SERVICES_REVISION_ID,
+    ServiceRevision,
+    bump_services_revision,
+    has_services_revision,
 )
 
+# Routes are collected on a router and mounted by create_app() below.
+router = APIRouter()
+
 # =========================================================
 #                  SCHEMAS
 # =========================================================
@@ -62,40 +81,269 @@ class ServiceOut(ServiceBase):
         orm_mode = True
 
 
+SERVICE_FIELDS = tuple(ServiceOut.model_fields)
+
+
+# =========================================================
+#                  CONDITIONAL GET HELPERS
+# =========================================================
+
+
+def _parse_fields(fields: str | None) -> tuple[str, ...] | None:
+    """Parse a `fields=a,b` projection; None means the full representation."""
+    if not fields:
+        return None
+    requested = tuple(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in requested if f not in SERVICE_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown field(s): {', '.join(unknown)}. "
+            f"Allowed: {', '.join(SERVICE_FIELDS)}",
+        )
+    return requested or None
+
+
+def _services_validator(
+    db: Session, fields: tuple[str, ...] | None
+) -> tuple[str, datetime | None]:
+    """
+    Build a weak ETag and Last-Modified for the services list with one
+    aggregate query — no rows are loaded or serialized.
+
+    The shared revision row changes on every API write, deletes included,
+    so the validators agree across workers. Count and max timestamps still
+    catch rows written outside the API.
+    """
+    revision = changed_at = literal(None)
+    if has_services_revision(db):
+        revision = (
+            select(ServiceRevision.revision)
+            .where(ServiceRevision.id == SERVICES_REVISION_ID)
+            .scalar_subquery()
+        )
+        changed_at = (
+            select(ServiceRevision.changed_at)
+            .where(ServiceRevision.id == SERVICES_REVISION_ID)
+            .scalar_subquery()
+        )
+    count, last_updated, last_created, rev, last_changed = db.query(
+        func.count(Service.id),
+        func.max(Service.updated_at),
+        func.max(Service.created_at),
+        revision,
+        changed_at,
+    ).one()
+    last_modified = max(
+        filter(None, (last_updated, last_created, last_changed)), default=None
+    )
+
+    token = "|".join(
+        (
+            str(count),
+            last_modified.isoformat() if last_modified else "-",
+            str(rev or 0),
+            ",".join(fields or ()),
+        )
+    )
+    digest = hashlib.blake2b(token.encode(), digest_size=8).hexdigest()
+    if last_modified and datetime.utcnow() - last_modified < timedelta(seconds=1):
+        # HTTP dates have one-second resolution: another write in this same
+        # second would be invisible to If-Modified-Since, so only ETag is used.
+        last_modified = None
+    # Weak: the body may be re-encoded (gzip/br) by the compression middleware.
+    return f'W/"{digest}"', last_modified
+
+
+def _cache_headers(etag: str, last_modified: datetime | None) -> dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(
+            last_modified.replace(tzinfo=timezone.utc), usegmt=True
+        )
+    return headers
+
+
+def _is_not_modified(
+    request: Request, etag: str, last_modified: datetime | None
+) -> bool:
+    """Evaluate If-None-Match (preferred) or If-Modified-Since per RFC 9110."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        ours = etag.removeprefix("W/")
+        return any(
+            tag.strip().removeprefix("W/") == ours for tag in if_none_match.split(",")
+        )
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        # HTTP dates have one-second resolution.
+        modified = last_modified.replace(tzinfo=timezone.utc, microsecond=0)
+        return modified <= since
+    return False
+
+
 # =========================================================
 #                  HEALTH & ANALYTICS
 # =========================================================
 
 
-@app.get("/api/v1/status", tags=["Health"])
+@router.get("/api/v1/status", tags=["Health"])
 async def get_status():
     """Basic health check."""
     return {"status": "API is operational", "version": "2.1.0"}
 
 
-@app.get("/api/v1/analytics", tags=["Analytics"])
-async def get_analytics(log_path: str | None = None):
-    """Analyze access logs and return summarized stats."""
+@router.get("/api/v1/analytics", tags=["Analytics"])
+async def get_analytics(
+    request: Request,
+    log_path: str | None = None,
+    sample_bytes: int | None = Query(None, gt=0),
+    sample_seconds: float | None = Query(None, gt=0),
+):
+    """
+    Analyze access logs and return summarized stats.
+    `sample_bytes` / `sample_seconds` switch to sampled estimates with 95%
+    confidence intervals for very large logs.
+    """
+    from app.log_analyzer import analyze_logs  # deferred: keeps app import lean
+
     path = log_path or "/var/log/nginx/access.log"
+    if sample_bytes is not None or sample_seconds is not None:
+        result = await asyncio.to_thread(
+            analyze_logs, path, sample_bytes=sample_bytes, sample_seconds=sample_seconds
+        )
+        if "error" in result:
+            raise HTTPException(status_code=404, detail=result["error"])
+        return result
+
+    shared = request.app.state.shared_analytics
+    if shared is not None and Path(path).exists():
+        # Multi-worker mode: serve the published snapshot bytes directly.
+        payload = await asyncio.to_thread(shared.get_or_compute, path)
+        if isinstance(payload, dict):
+            raise HTTPException(status_code=404, detail=payload["error"])
+        return Response(content=payload, media_type="application/json")
+
     result = analyze_logs(path)
     if "error" in result:
         raise HTTPException(status_code=404, detail=result["error"])
     return result
 
 
+def _confined_log_path(log_path: str | None) -> Path:
+    """Resolve `log_path` (default LOG_DIR/access.log); 403 if outside LOG_DIR."""
+    log_dir = Path(os.getenv("LOG_DIR", "/var/log/nginx")).resolve()
+    path = Path(log_path or log_dir / "access.log").resolve()
+    if not path.is_relative_to(log_dir):
+        raise HTTPException(
+            status_code=403, detail=f"log_path must be inside {log_dir}"
+        )
+    return path
+
+
+@router.get("/api/v1/analytics/anomalies/live", tags=["Analytics"])
+async def stream_anomalies(log_path: str | None = None):
+    """
+    Live feed (Server-Sent Events) of error-rate and traffic anomalies as
+    they happen. `log_path` must be inside LOG_DIR; all clients of one log
+    share a single tailer.
+    """
+    path = _confined_log_path(log_path)
+    if not path.exists():
+        raise HTTPException(status_code=404, detail=f"Log file not found: {path}")
+    from app.log_analyzer import subscribe_anomalies
+
+    async def events():
+        async for anomaly in subscribe_anomalies(path):
+            if anomaly is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield f"event: anomaly\ndata: {json.dumps(anomaly)}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@router.get("/api/v1/logs/search", tags=["Analytics"])
+async def search_access_logs(
+    log_path: str | None = None,
+    status_code: str | None = Query(None, alias="status", pattern=r"^\d{3}$"),
+    ip: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    cursor: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+):
+    """
+    Drill down to raw access log lines by status, IP and time range.
+    Uses an incrementally maintained byte-offset index; pass `next_cursor`
+    back as `cursor` to page through results.
+
+    `log_path` must be inside LOG_DIR (default /var/log/nginx), and at
+    least one filter is required.
+    """
+    from app.log_analyzer import search_logs
+
+    if status_code is None and ip is None and since is None and until is None:
+        raise HTTPException(
+            status_code=400, detail="Pass at least one of status, ip, since, until"
+        )
+    path = _confined_log_path(log_path)
+    result = await asyncio.to_thread(
+        search_logs, path, status_code, ip, since, until, cursor, limit
+    )
+    if "error" in result:
+        raise HTTPException(status_code=404, detail=result["error"])
+    return result
+
+
 # =========================================================
 #                  SERVICES CRUD
 # =========================================================
 
 
-@app.get("/api/v1/services", response_model=List[ServiceOut], tags=["Services"])
-async def get_services(db: Session = Depends(get_db)):
-    """Fetch all registered services."""
-    # Use yield-based sessions for memory safety
-    return db.query(Service).all()
+@router.get("/api/v1/services", response_model=List[ServiceOut], tags=["Services"])
+async def get_services(
+    request: Request,
+    response: Response,
+    fields: str | None = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Fetch all registered services.
+
+    Supports conditional GET (ETag / Last-Modified -> 304 without loading
+    rows) and `fields=id,name` projection to shrink the payload.
+    """
+    selected = _parse_fields(fields)
+    etag, last_modified = _services_validator(db, selected)
+    headers = _cache_headers(etag, last_modified)
+
+    if _is_not_modified(request, etag, last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if selected is None:
+        response.headers.update(headers)
+        # Use yield-based sessions for memory safety
+        return db.query(Service).all()
+
+    # Projection: select only the requested columns, skipping ORM hydration.
+    rows = db.query(*(getattr(Service, f) for f in selected)).all()
+    content = jsonable_encoder([dict(zip(selected, row)) for row in rows])
+    return JSONResponse(content=content, headers=headers)
 
 
-@app.get("/api/v1/services/{service_id}", response_model=ServiceOut, tags=["Services"])
+@router.get(
+    "/api/v1/services/{service_id}", response_model=ServiceOut, tags=["Services"]
+)
 async def get_service(service_id: int, db: Session = Depends(get_db)):
     """Fetch a service by ID."""
     service = db.get(Service, service_id)
@@ -104,7 +352,7 @@ async def get_service(service_id: int, db: Session = Depends(get_db)):
     return service
 
 
-@app.post(
+@router.post(
     "/api/v1/services",
     response_model=ServiceOut,
     status_code=status.HTTP_201_CREATED,
@@ -119,6 +367,7 @@ async def create_service(service: ServiceCreate, db: Session = Depends(get_db)):
     )
     db.add(new_service)
     try:
+        bump_services_revision(db)
         db.commit()
         db.refresh(new_service)
     except Exception:
@@ -127,7 +376,9 @@ async def create_service(service: ServiceCreate, db: Session = Depends(get_db)):
     return new_service
 
 
-@app.put("/api/v1/services/{service_id}", response_model=ServiceOut, tags=["Services"])
+@router.put(
+    "/api/v1/services/{service_id}", response_model=ServiceOut, tags=["Services"]
+)
 async def update_service(
     service_id: int, updated: ServiceUpdate, db: Session = Depends(get_db)
 ):
@@ -141,6 +392,7 @@ async def update_service(
     service.updated_at = datetime.utcnow()
 
     try:
+        bump_services_revision(db)
         db.commit()
         db.refresh(service)
     except Exception:
@@ -150,7 +402,7 @@ async def update_service(
     return service
 
 
-@app.delete("/api/v1/services/{service_id}", tags=["Services"])
+@router.delete("/api/v1/services/{service_id}", tags=["Services"])
 async def delete_service(service_id: int, db: Session = Depends(get_db)):
     """Remove a service record."""
     service = db.get(Service, service_id)
@@ -159,6 +411,7 @@ async def delete_service(service_id: int, db: Session = Depends(get_db)):
 
     try:
         db.delete(service)
+        bump_services_revision(db)
         db.commit()
     except Exception:
         db.rollback()
@@ -172,12 +425,80 @@ async def delete_service(service_id: int, db: Session = Depends(get_db)):
 # =========================================================
 
 
-@app.get("/", include_in_schema=False)
+@router.get("/", include_in_schema=False)
 async def root():
     """API root."""
     return {"message": "Welcome to DevOps Lab API!", "docs_url": "/docs"}
 
 
+# =========================================================
+#                  APP FACTORY
+# =========================================================
+
+
+def _report_prewarm(task: asyncio.Task) -> None:
+    # get_engine() itself can fail (bad DATABASE_URL, missing driver);
+    # surface it instead of "Task exception was never retrieved".
+    if not task.cancelled() and task.exception() is not None:
+        warnings.warn(
+            f"Connection pool pre-warm failed: {task.exception()!r}", RuntimeWarning
+        )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Start serving immediately; open DB connections in the background so the
+    first real request finds a warm pool. DB_POOL_PREWARM=0 disables it.
+    """
+    prewarm = int(os.getenv("DB_POOL_PREWARM", "2"))
+    task = None
+    if prewarm:
+        task = asyncio.create_task(asyncio.to_thread(warm_pool, prewarm))
+        task.add_done_callback(_report_prewarm)
+    try:
+        yield
+    finally:
+        if task is not None:
+            await asyncio.wait({task}, timeout=5)
+        if app.state.shared_analytics is not None:
+            app.state.shared_analytics.close()
+        dispose_engine()
+
+
+def create_app(query_count_header: bool | None = None) -> FastAPI:
+    """
+    Build the FastAPI application (used by uvicorn and the tests).
+    `query_count_header` defaults to the DB_QUERY_COUNT_HEADER env var.
+    """
+    load_env()  # so .env can set DB_POOL_PREWARM, ANALYTICS_SHARED, ...
+    application = FastAPI(
+        title="DevOps Lab API",
+        version="2.1.0",
+        description="A FastAPI-based DevOps monitoring and analytics backend powered by PostgreSQL.",
+        lifespan=lifespan,
+    )
+    # Large service lists and analytics payloads compress well (brotli or gzip).
+    application.add_middleware(CompressionMiddleware, minimum_size=500)
+    if query_count_header is None:
+        flag = os.getenv("DB_QUERY_COUNT_HEADER", "").lower()
+        query_count_header = flag in ("1", "true", "yes")
+    if query_count_header:
+        # Used by the load-testing harness (app.loadtest) to report queries/request.
+        application.add_middleware(QueryCountMiddleware)
+    application.include_router(router)
+    # ANALYTICS_SHARED=leader|sidecar shares results across uvicorn workers.
+    application.state.shared_analytics = None
+    if os.getenv("ANALYTICS_SHARED", "off").strip().lower() != "off":
+        from app import analytics_cache  # only needed in multi-worker mode
+
+        application.state.shared_analytics = analytics_cache.from_env()
+    return application
+
+
+app = create_app()
+
+
 # =========================================================
 #                  ENTRYPOINT
 # =========================================================
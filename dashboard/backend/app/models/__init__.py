@@ -1 +1,2 @@
 from .service_model import Service  # noqa: F401
+from .service_revision import ServiceRevision  # noqa: F401
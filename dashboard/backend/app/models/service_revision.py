@@ -0,0 +1,79 @@
+import warnings
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer, inspect, update
+from sqlalchemy.exc import IntegrityError
+
+from app.database import Base
+
+# The services table has a single revision row.
+SERVICES_REVISION_ID = 1
+
+# Engines already known to have the table (negative results aren't cached,
+# so running the migration takes effect without a restart).
+_ENGINES_WITH_TABLE: set = set()
+
+
+class ServiceRevision(Base):
+    """Change counter for the services table, shared by every worker."""
+
+    __tablename__ = "service_revisions"
+
+    id = Column(Integer, primary_key=True)
+    revision = Column(Integer, nullable=False, default=0)
+    changed_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+def has_services_revision(db) -> bool:
+    """True once the service_revisions migration has been applied."""
+    bind = db.get_bind()
+    if bind in _ENGINES_WITH_TABLE:
+        return True
+    if inspect(bind).has_table(ServiceRevision.__tablename__):
+        _ENGINES_WITH_TABLE.add(bind)
+        return True
+    warnings.warn(
+        "service_revisions table missing; run `alembic upgrade head`. "
+        "Falling back to count/timestamp validators (deletes may go unnoticed).",
+        RuntimeWarning,
+    )
+    return False
+
+
+def _increment(db, now: datetime) -> int:
+    return db.execute(
+        update(ServiceRevision)
+        .where(ServiceRevision.id == SERVICES_REVISION_ID)
+        .values(revision=ServiceRevision.revision + 1, changed_at=now)
+    ).rowcount
+
+
+def seed_services_revision(db, revision: int = 0) -> None:
+    """Insert the revision row if missing; safe against a concurrent insert."""
+    if db.get(ServiceRevision, SERVICES_REVISION_ID) is not None:
+        return
+    try:
+        with db.begin_nested():
+            db.add(
+                ServiceRevision(
+                    id=SERVICES_REVISION_ID,
+                    revision=revision,
+                    changed_at=datetime.utcnow(),
+                )
+            )
+    except IntegrityError:
+        pass  # another writer created it first
+
+
+def bump_services_revision(db) -> None:
+    """
+    Record a write to `services` in the caller's transaction.
+    Inserts, updates and deletes all bump it, so list validators change on delete.
+    """
+    if not has_services_revision(db):
+        return
+    now = datetime.utcnow()
+    if _increment(db, now) == 0:
+        # No seed row yet (e.g. created by hand): create it, then bump.
+        seed_services_revision(db)
+        _increment(db, now)
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+startup_profile.py
+------------------
+Cold-start profiler for the API.
+
+Measures, each in a fresh interpreter:
+- Import time per module (`python -X importtime`), heaviest first
+- Boot-to-ready: spawn uvicorn and time the first successful response,
+  both for the health check and for the first DB-backed request
+
+Usage:
+    python -m app.startup_profile --top 15 --json startup.json
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent  # .../backend
+
+IMPORTTIME_LINE = re.compile(
+    r"import time:\s+(?P<self>\d+)\s+\|\s+(?P<cumulative>\d+)\s+\|\s(?P<name>.+)$"
+)
+
+
+def profile_imports(module: str = "app.main", top: int = 15) -> dict:
+    """Import `module` in a fresh interpreter and report per-module import time."""
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BASE_DIR,
+        capture_output=True,
+        text=True,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+
+    modules = []
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        name = match["name"]
+        modules.append(
+            {
+                "module": name.strip(),
+                "depth": (len(name) - len(name.lstrip())) // 2,
+                "self_ms": int(match["self"]) / 1000,
+                "cumulative_ms": int(match["cumulative"]) / 1000,
+            }
+        )
+
+    if proc.returncode != 0:
+        return {"error": f"Importing {module} failed (exit {proc.returncode})"}
+
+    by_cumulative = sorted(modules, key=lambda m: m["cumulative_ms"], reverse=True)
+    return {
+        "module": module,
+        "interpreter_wall_ms": round(wall_ms, 1),
+        # Top-level entries (depth 0) are the packages imported directly.
+        "total_import_ms": round(
+            sum(m["cumulative_ms"] for m in modules if m["depth"] == 0), 1
+        ),
+        "modules_imported": len(modules),
+        "slowest_modules": by_cumulative[:top],
+        "slowest_self": sorted(modules, key=lambda m: m["self_ms"], reverse=True)[:top],
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for(url: str, deadline: float) -> float | None:
+    """Poll `url` until it answers 2xx/3xx; return the time it did, or None."""
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as resp:
+                if resp.status < 400:
+                    return time.perf_counter()
+        except (urllib.error.URLError, ConnectionError, OSError):
+            pass
+        time.sleep(0.01)
+    return None
+
+
+def profile_boot(
+    app_path: str = "app.main:app",
+    ready_path: str = "/api/v1/status",
+    db_path: str = "/api/v1/services?fields=id",
+    timeout: float = 30.0,
+) -> dict:
+    """Start uvicorn and time process spawn -> first response (health, then DB)."""
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            app_path,
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        cwd=BASE_DIR,
+        env=os.environ.copy(),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = started + timeout
+        ready_at = _wait_for(base_url + ready_path, deadline)
+        if ready_at is None:
+            return {"error": f"Server not ready within {timeout}s"}
+        db_at = _wait_for(base_url + db_path, deadline)
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+    return {
+        "app": app_path,
+        "time_to_first_response_ms": round((ready_at - started) * 1000, 1),
+        "time_to_first_db_response_ms": (
+            round((db_at - started) * 1000, 1) if db_at is not None else None
+        ),
+    }
+
+
+def main():
+    """CLI entrypoint — prints a JSON startup report."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Profile API cold start.")
+    parser.add_argument(
+        "--module", default="app.main", help="Module to import-profile."
+    )
+    parser.add_argument("--top", type=int, default=15, help="Slowest modules to list.")
+    parser.add_argument(
+        "--no-server", action="store_true", help="Skip the uvicorn boot-to-ready run."
+    )
+    parser.add_argument("--json", metavar="PATH", help="Also write the report to PATH.")
+    args = parser.parse_args()
+
+    report = {"imports": profile_imports(args.module, args.top)}
+    if not args.no_server:
+        report["boot"] = profile_boot()
+
+    output = json.dumps(report, indent=2)
+    if args.json:
+        Path(args.json).write_text(output, encoding="utf-8")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
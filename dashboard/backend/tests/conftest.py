@@ -0,0 +1,21 @@
+import os
+import shutil
+import tempfile
+
+import pytest
+
+# Tests get a throwaway SQLite database, never the one configured in .env
+# (set before any app module is imported; real env vars beat .env).
+_TEST_DB_DIR = tempfile.mkdtemp(prefix="devops-lab-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_TEST_DB_DIR}/test.db"
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    """Create the schema once for the whole run, then delete the DB."""
+    from app.database import dispose_engine, init_db
+
+    init_db()
+    yield
+    dispose_engine()
+    shutil.rmtree(_TEST_DB_DIR, ignore_errors=True)
@@ -0,0 +1,94 @@
+import json
+
+import pytest
+from app.analytics_cache import SharedAnalytics
+
+LOG_LINES = """127.0.0.1 - - [07/Nov/2025:12:00:00 +0000] "GET /index.html HTTP/1.1" 200
+192.168.0.2 - - [07/Nov/2025:12:01:00 +0000] "POST /login HTTP/1.1" 502
+"""
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    path = tmp_path / "access.log"
+    path.write_text(LOG_LINES, encoding="utf-8")
+    return path
+
+
+def test_publish_and_read_snapshot(tmp_path, log_file):
+    cache = SharedAnalytics(directory=tmp_path / "shm")
+    assert cache.read(log_file) is None
+
+    assert cache.publish(log_file, {"total_requests": 2}) == 1
+    assert cache.publish(log_file, {"total_requests": 3}) == 2
+
+    # A second instance (another worker) sees the latest version.
+    other = SharedAnalytics(directory=tmp_path / "shm")
+    snapshot = other.read(log_file)
+    assert snapshot.version == 2
+    assert json.loads(snapshot.payload) == {"total_requests": 3}
+
+
+def test_get_or_compute_computes_once(tmp_path, log_file):
+    calls = []
+
+    def compute(path):
+        calls.append(path)
+        return {"total_requests": len(calls)}
+
+    leader = SharedAnalytics(directory=tmp_path / "shm", compute=compute)
+    follower = SharedAnalytics(directory=tmp_path / "shm", compute=compute)
+
+    assert json.loads(leader.get_or_compute(log_file)) == {"total_requests": 1}
+    assert json.loads(follower.get_or_compute(log_file)) == {"total_requests": 1}
+    assert len(calls) == 1
+
+
+def test_stale_snapshot_is_recomputed(tmp_path, log_file):
+    cache = SharedAnalytics(directory=tmp_path / "shm", max_staleness=0)
+    cache.get_or_compute(log_file)
+    with log_file.open("a", encoding="utf-8") as f:
+        f.write(LOG_LINES)
+
+    result = json.loads(cache.get_or_compute(log_file))
+    assert result["total_requests"] == 4
+    assert cache.read(log_file).version == 2
+
+
+def test_compute_error_is_returned_not_published(tmp_path, log_file):
+    calls = []
+
+    def compute(path):
+        calls.append(path)
+        return {"error": f"Log file not found: {path}"}
+
+    cache = SharedAnalytics(directory=tmp_path / "shm", compute=compute)
+    result = cache.get_or_compute(log_file)
+    assert result == {"error": f"Log file not found: {log_file.resolve()}"}
+    assert len(calls) == 1  # no second local compute
+    assert cache.read(log_file) is None
+
+
+def test_stale_snapshot_is_served_while_another_worker_refreshes(tmp_path, log_file):
+    import fcntl
+
+    calls = []
+
+    def compute(path):
+        calls.append(path)
+        return {"total_requests": len(calls)}
+
+    cache = SharedAnalytics(
+        directory=tmp_path / "shm", max_staleness=0, compute=compute
+    )
+    cache.get_or_compute(log_file)
+    with log_file.open("a", encoding="utf-8") as f:
+        f.write(LOG_LINES)
+
+    # Another worker holds the refresh lock: serve stale instead of blocking.
+    _, lock_path = cache._paths(log_file.resolve())
+    with lock_path.open("a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        assert json.loads(cache.get_or_compute(log_file)) == {"total_requests": 1}
+    assert len(calls) == 1
+    assert json.loads(cache.get_or_compute(log_file)) == {"total_requests": 2}
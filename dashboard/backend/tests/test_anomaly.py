@@ -0,0 +1,54 @@
+from app.anomaly import ErrorRateDetector, log_time_to_epoch
+
+
+def test_log_time_to_epoch_handles_offsets():
+    assert log_time_to_epoch("07/Nov/2025:12:00:00 +0000") == 1762516800
+    assert log_time_to_epoch("07/Nov/2025:14:00:00 +0200") == 1762516800
+    assert log_time_to_epoch("garbage") is None
+
+
+def test_detector_needs_baseline_before_flagging():
+    detector = ErrorRateDetector(window_seconds=60, warmup=3, min_requests=5)
+    # Errors from the very first window are baseline, not an anomaly.
+    for i in range(10):
+        detector.observe(i, "/", "500")
+    assert detector.finish() == []
+
+
+def test_detector_key_count_is_bounded():
+    detector = ErrorRateDetector(max_keys=3)
+    for i in range(10):
+        detector.observe(0, f"/item/{i}?page=2", "200")
+    assert len(detector.endpoints) == 3
+    assert detector.evicted_keys == 7
+    assert "/item/9" in detector.endpoints
+
+
+def _feed(detector, windows, per_window):
+    for window in windows:
+        for i in range(per_window):
+            detector.observe(window * 60 + i % 60, "/", "200")
+
+
+def test_detector_flags_traffic_surge():
+    detector = ErrorRateDetector(warmup=3, min_requests=5)
+    _feed(detector, range(6), 30)
+    _feed(detector, [6], 200)
+    _feed(detector, [7], 30)  # closes the surge window
+    kinds = [a["kind"] for a in detector.anomalies]
+    assert kinds == ["traffic_surge"]
+    assert detector.anomalies[0]["requests"] == 200
+
+
+def test_detector_flags_traffic_collapse_on_empty_windows():
+    detector = ErrorRateDetector(warmup=3, min_requests=5)
+    _feed(detector, range(6), 30)
+    # Live tail: nothing logged for a few minutes.
+    raised = detector.advance(10 * 60)
+    assert raised and all(a["kind"] == "traffic_collapse" for a in raised)
+    assert raised[0]["requests"] == 0
+    # The trailing, partial window of a batch run is never called a collapse.
+    detector = ErrorRateDetector(warmup=3, min_requests=5)
+    _feed(detector, range(6), 30)
+    _feed(detector, [6], 2)
+    assert detector.finish() == []
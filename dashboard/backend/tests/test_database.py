@@ -5,3 +5,12 @@ from app.database import engine, Base
 def test_services_table_exists():
     inspector = inspect(engine)
     assert "services" in inspector.get_table_names()
+
+
+def test_engine_is_created_lazily():
+    from app.database import dispose_engine, get_engine
+
+    dispose_engine()
+    assert get_engine.cache_info().currsize == 0
+    assert get_engine() is get_engine()
+    assert get_engine.cache_info().currsize == 1
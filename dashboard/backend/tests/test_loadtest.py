@@ -0,0 +1,60 @@
+import asyncio
+import os
+import random
+
+import pytest
+from app.loadtest import (
+    Workload,
+    _in_process_client,
+    _percentile,
+    parse_mix,
+    run_closed_loop,
+)
+
+
+def test_parse_mix():
+    assert parse_mix("get_services=3,update_service=1") == {
+        "get_services": 3.0,
+        "update_service": 1.0,
+    }
+    with pytest.raises(ValueError):
+        parse_mix("drop_table=1")
+
+
+def test_percentile_nearest_rank():
+    samples = [i / 1000 for i in range(1, 101)]  # 1..100 ms
+    assert _percentile(samples, 50) == 50.0
+    assert _percentile(samples, 99) == 99.0
+    assert _percentile([], 99) is None
+
+
+def test_closed_loop_in_process_counts_queries():
+    from app.database import get_engine
+
+    from app.database import get_sessionmaker
+    from app.models import Service
+
+    echo = get_engine().echo
+    env = dict(os.environ)
+    with get_sessionmaker()() as db:
+        rows = db.query(Service).count()
+
+    async def scenario():
+        async with _in_process_client() as client:
+            workload = Workload(client, random.Random(0))
+            await workload.seed(2)
+            return await run_closed_loop(
+                workload, {"get_service": 1}, concurrency=2, duration=0.2, warmup=0
+            )
+
+    stats, elapsed, dropped = asyncio.run(scenario())
+    summary = stats["get_service"].summary(elapsed)
+    assert summary["requests"] > 0
+    assert summary["errors"] == 0
+    assert summary["db_queries_per_request"] == 1.0
+    assert dropped == 0
+    # The harness must not leak its settings into the rest of the process.
+    assert get_engine().echo == echo
+    assert dict(os.environ) == env
+    with get_sessionmaker()() as db:  # the configured DB is never written to
+        assert db.query(Service).count() == rows
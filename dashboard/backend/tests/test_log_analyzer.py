@@ -1,8 +1,10 @@
 import os
 import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
 
 import pytest
-from app.log_analyzer import analyze_logs
+from app.log_analyzer import LogIndex, analyze_logs, sample_logs, search_logs
 
 
 @pytest.fixture
@@ -33,3 +35,240 @@ def test_analyze_logs_missing_file():
     assert isinstance(result, dict)
     assert "error" in result
     assert "not found" in result["error"].lower()
+
+
+def test_search_logs_by_status_and_ip(sample_log_file):
+    """Index lookups return the raw matching lines."""
+    result = search_logs(sample_log_file, status="200", ip="127.0.0.1")
+    assert result["count"] == 2
+    assert all(entry["line"].startswith("127.0.0.1") for entry in result["lines"])
+    assert result["next_cursor"] is None
+
+
+def test_search_logs_time_range_and_pagination(sample_log_file):
+    since = datetime(2025, 11, 7, 12, 1, tzinfo=timezone.utc)
+    first = search_logs(sample_log_file, since=since, limit=1)
+    assert first["count"] == 1
+    assert "POST /login" in first["lines"][0]["line"]
+
+    second = search_logs(sample_log_file, since=since, cursor=first["next_cursor"])
+    assert second["count"] == 1
+    assert "GET /about" in second["lines"][0]["line"]
+
+
+def test_search_logs_only_returns_access_log_lines(tmp_path):
+    """Arbitrary files (e.g. /etc/passwd) must not be readable via search."""
+    path = tmp_path / "passwd"
+    path.write_text("root:x:0:0:root:/root:/bin/bash\n", encoding="utf-8")
+    assert search_logs(path)["lines"] == []
+    since = datetime(2025, 11, 7, tzinfo=timezone.utc)
+    assert search_logs(path, since=since)["lines"] == []
+
+
+def test_search_logs_index_cache_is_bounded(tmp_path, sample_log_file):
+    from app import log_analyzer
+
+    for i in range(log_analyzer.MAX_LOG_INDEXES + 3):
+        path = tmp_path / f"access{i}.log"
+        path.write_text(open(sample_log_file).read(), encoding="utf-8")
+        assert search_logs(path, status="200")["count"] == 2
+    assert len(log_analyzer._LOG_INDEXES) == log_analyzer.MAX_LOG_INDEXES
+
+
+def test_search_logs_persists_index_across_restarts(
+    tmp_path, sample_log_file, monkeypatch
+):
+    from app import log_analyzer
+
+    monkeypatch.setenv("LOG_INDEX_DIR", str(tmp_path / "idx"))
+    monkeypatch.setattr(log_analyzer, "SAVE_EVERY_LINES", 1)
+    assert search_logs(sample_log_file, status="200")["count"] == 2
+    assert list((tmp_path / "idx").glob("*.idx"))
+
+    # A restarted worker loads the saved index instead of rescanning.
+    log_analyzer._LOG_INDEXES.clear()
+    added = []
+    update = log_analyzer.LogIndex.update
+    monkeypatch.setattr(
+        log_analyzer.LogIndex, "update", lambda self: added.append(update(self))
+    )
+    assert search_logs(sample_log_file, status="200")["count"] == 2
+    assert added == [0]
+
+
+def test_search_logs_slow_build_only_blocks_its_own_log(tmp_path, sample_log_file):
+    from app import log_analyzer
+
+    other = tmp_path / "other.log"
+    other.write_text(open(sample_log_file).read(), encoding="utf-8")
+    busy = log_analyzer._index_entry(Path(sample_log_file).resolve())
+    with busy.lock:  # e.g. a first full build of a huge log in another thread
+        assert search_logs(other, status="200")["count"] == 2
+
+
+def test_log_index_updates_incrementally(sample_log_file):
+    index = LogIndex(sample_log_file)
+    assert index.update() == 3
+    with open(sample_log_file, "a", encoding="utf-8") as f:
+        f.write('10.0.0.9 - - [07/Nov/2025:12:03:00 +0000] "GET / HTTP/1.1" 502\n')
+    assert index.update() == 1
+    assert [line for _, line in index.search(status="502")] == [
+        '10.0.0.9 - - [07/Nov/2025:12:03:00 +0000] "GET / HTTP/1.1" 502'
+    ]
+
+
+def test_analyze_logs_flags_error_burst(tmp_path):
+    """A 5xx burst stands out against a steady baseline in one pass."""
+    lines = []
+    for minute in range(10):
+        for second in range(0, 60, 2):
+            status = "502" if minute == 8 and second % 4 == 0 else "200"
+            lines.append(
+                f"10.0.0.1 - - [07/Nov/2025:03:{minute:02d}:{second:02d} +0000] "
+                f'"GET /api/v1/services HTTP/1.1" {status}'
+            )
+    log = tmp_path / "access.log"
+    log.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    anomalies = analyze_logs(log)["anomalies"]["detected"]
+    assert {a["key"] for a in anomalies} == {"*", "/api/v1/services"}
+    assert all(a["window_start"].startswith("2025-11-07T03:08") for a in anomalies)
+
+
+def _write_large_log(tmp_path, lines=4000):
+    path = tmp_path / "large.log"
+    with path.open("w", encoding="utf-8") as f:
+        for i in range(lines):
+            status = "502" if i % 10 == 0 else "200"
+            f.write(
+                f"10.0.0.{i % 7} - - [07/Nov/2025:12:{i % 60:02d}:00 +0000] "
+                f'"GET /page/{i % 3} HTTP/1.1" {status}\n'
+            )
+    return path
+
+
+def test_sampled_analysis_reports_intervals(tmp_path):
+    path = _write_large_log(tmp_path)
+    result = sample_logs(path, budget_bytes=20_000, block_size=4096, seed=7)
+    assert result["mode"] == "sampled"
+    assert 0 < result["sampled_fraction"] < 1
+    total = result["total_requests"]
+    assert total["ci95"][0] <= 4000 <= total["ci95"][1]
+    assert "502" in result["status_counts"]
+
+
+def test_sampled_analysis_converges_to_exact(tmp_path):
+    path = _write_large_log(tmp_path)
+    exact = analyze_logs(path)
+    result = analyze_logs(path, sample_bytes=10**9, seed=1)
+    assert result["sampled_fraction"] == 1.0
+    assert result["total_requests"]["estimate"] == exact["total_requests"]
+    assert result["total_requests"]["stderr"] == 0
+    assert {code: v["estimate"] for code, v in result["status_counts"].items()} == (
+        exact["status_counts"]
+    )
+
+
+def test_sampled_intervals_never_collapse_before_full_read(tmp_path):
+    """Identical blocks have zero sample variance; the interval must stay open."""
+    line = '10.0.0.1 - - [07/Nov/2025:12:00:00 +0000] "GET / HTTP/1.1" 200\n'
+    block = line * (4096 // len(line))
+    path = tmp_path / "uniform.log"
+    path.write_text(block.ljust(4096, "\n") * 50 + "x" * 10, encoding="utf-8")
+    # Only the tail block has this code; no sampled block can contain it.
+    with path.open("a", encoding="utf-8") as f:
+        f.write("\n" + line.replace(" 200", " 503"))
+
+    result = sample_logs(path, budget_bytes=5 * 4096, block_size=4096, seed=3)
+    low, high = result["total_requests"]["ci95"]
+    assert low < result["total_requests"]["estimate"] < high
+    assert result["status_counts"]["503"]["ci95"][0] == 1
+    assert result["status_counts"]["503"]["ci95"][1] > 1
+    unseen = result["unseen_status_bound"]
+    assert unseen["estimate"] == 0 and unseen["ci95"][0] == 0
+    assert unseen["ci95"][1] > 0
+
+
+def test_follow_anomalies_survives_rotation(tmp_path):
+    """After logrotate renames the file, lines in the new file are still seen."""
+    import asyncio
+
+    from app.log_analyzer import follow_anomalies
+
+    class EchoDetector:
+        def observe(self, epoch, endpoint, status):
+            return [endpoint]
+
+        def advance(self, epoch):
+            return []
+
+    log = tmp_path / "access.log"
+    line = '10.0.0.1 - - [07/Nov/2025:03:00:00 +0000] "GET {} HTTP/1.1" 200\n'
+    log.write_text(line.format("/primed"), encoding="utf-8")
+
+    async def run():
+        feed = follow_anomalies(log, poll_interval=0.01, detector=EchoDetector())
+        first = asyncio.ensure_future(feed.__anext__())
+        await asyncio.sleep(0.05)
+        with log.open("a", encoding="utf-8") as f:
+            f.write(line.format("/before"))
+        assert await asyncio.wait_for(first, 1) == "/before"
+
+        log.rename(tmp_path / "access.log.1")
+        log.write_text(line.format("/after"), encoding="utf-8")
+        assert await asyncio.wait_for(feed.__anext__(), 1) == "/after"
+        await feed.aclose()
+
+    asyncio.run(run())
+
+
+def test_live_subscribers_share_one_tailer(tmp_path, monkeypatch):
+    """N SSE clients of one log cost one tailer + detector, not N passes."""
+    import asyncio
+
+    from app import log_analyzer
+
+    log = tmp_path / "access.log"
+    log.write_text("", encoding="utf-8")
+    started = []
+
+    async def fake_follow(log_path, heartbeat):
+        started.append(log_path)
+        await asyncio.sleep(0.01)
+        yield {"key": "*", "kind": "error_rate"}
+        await asyncio.sleep(3600)
+
+    monkeypatch.setattr(log_analyzer, "follow_anomalies", fake_follow)
+
+    async def run():
+        first = log_analyzer.subscribe_anomalies(log, heartbeat=5)
+        second = log_analyzer.subscribe_anomalies(log, heartbeat=5)
+        got = await asyncio.wait_for(
+            asyncio.gather(first.__anext__(), second.__anext__()), 1
+        )
+        assert got == [{"key": "*", "kind": "error_rate"}] * 2
+        await first.aclose()
+        await second.aclose()
+        assert log_analyzer._ANOMALY_FEEDS == {}
+
+    asyncio.run(run())
+    assert len(started) == 1
+
+
+def test_log_tailer_bounds_each_read(tmp_path):
+    """A large burst is parsed in capped steps (each off the event loop)."""
+    from app.anomaly import ErrorRateDetector
+    from app.log_analyzer import _LogTailer
+
+    log = tmp_path / "access.log"
+    log.write_text("", encoding="utf-8")
+    tailer = _LogTailer(log, ErrorRateDetector(), prime_bytes=0, max_read=200)
+    tailer.prime()
+    line = '10.0.0.1 - - [07/Nov/2025:03:00:00 +0000] "GET / HTTP/1.1" 200\n'
+    log.write_text(line * 20, encoding="utf-8")
+    steps = 1
+    while tailer.poll()[1]:
+        steps += 1
+    tailer.close()
+    assert steps >= len(line) * 20 // 200
+    assert tailer.detector.global_state.requests == 20
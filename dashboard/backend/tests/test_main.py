@@ -19,3 +19,82 @@ def test_status_endpoint():
         "API is live",
     ]  # supports both versions
     assert "version" in data
+
+
+def test_app_factory_lifespan():
+    """The factory builds a fresh app whose lifespan warms and disposes the pool."""
+    from app.database import get_engine
+    from app.main import create_app
+
+    with TestClient(create_app()) as client:
+        assert client.get("/api/v1/status").status_code == 200
+    assert get_engine.cache_info().currsize == 0
+
+
+def test_log_search_is_confined_to_log_dir(tmp_path, monkeypatch):
+    """The search endpoint refuses paths outside LOG_DIR and unfiltered scans."""
+    monkeypatch.setenv("LOG_DIR", str(tmp_path))
+    (tmp_path / "access.log").write_text(
+        '127.0.0.1 - - [07/Nov/2025:12:00:00 +0000] "GET / HTTP/1.1" 200\n',
+        encoding="utf-8",
+    )
+    client = TestClient(app)
+
+    outside = client.get(
+        "/api/v1/logs/search", params={"log_path": "/etc/passwd", "status": "200"}
+    )
+    assert outside.status_code == 403
+    escape = client.get(
+        "/api/v1/logs/search",
+        params={"log_path": str(tmp_path / ".." / "x.log"), "status": "200"},
+    )
+    assert escape.status_code == 403
+    assert client.get("/api/v1/logs/search").status_code == 400
+
+    inside = client.get("/api/v1/logs/search", params={"status": "200"})
+    assert inside.status_code == 200
+    assert inside.json()["count"] == 1
+
+
+def test_event_streams_are_not_compressed():
+    """SSE must reach the client as it is written, so it is never encoded."""
+    from app.compression import CompressionMiddleware
+    from fastapi import FastAPI
+    from fastapi.responses import StreamingResponse
+
+    sse_app = FastAPI()
+
+    @sse_app.get("/events")
+    async def events():
+        chunks = (f"data: {'x' * 400}\n\n" for _ in range(5))
+        return StreamingResponse(chunks, media_type="text/event-stream")
+
+    sse_app.add_middleware(CompressionMiddleware, minimum_size=100)
+    client = TestClient(sse_app)
+    for coding in ("gzip", "br"):
+        response = client.get("/events", headers={"Accept-Encoding": coding})
+        assert "content-encoding" not in response.headers
+        assert response.text.count("data: ") == 5
+
+
+def test_prewarm_failure_is_reported(monkeypatch):
+    """A failing pool pre-warm (bad URL, missing driver) is surfaced, not lost."""
+    import pytest
+    from app import main
+
+    def broken_warm_pool(connections):
+        raise RuntimeError("no such driver")
+
+    monkeypatch.setattr(main, "warm_pool", broken_warm_pool)
+    with pytest.warns(RuntimeWarning, match="no such driver"):
+        with TestClient(main.create_app()) as client:
+            assert client.get("/api/v1/status").status_code == 200
+
+
+def test_live_anomaly_feed_is_confined_to_log_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("LOG_DIR", str(tmp_path))
+    client = TestClient(app)
+    response = client.get(
+        "/api/v1/analytics/anomalies/live", params={"log_path": "/etc/passwd"}
+    )
+    assert response.status_code == 403